@@ -1,170 +1,53 @@
 import streamlit as st
 import pandas as pd
+import os
 import random
-from itertools import combinations, cycle
-import math
-from collections import deque # Usaremos deque para rotación eficiente
+import time
+from padel_core import (MAX_SCORE, FixtureError, StandingsLedger, StoreError, TournamentStore, bracket_score, frozen_round_count, generate_group_fixture, generate_standings_text, group_name,
+                        group_qualifiers, group_standings, knockout_bracket, match_sides, playoff_pairs, projected_duration, replan_americano_fixture,
+                        replan_round_robin_pairs_fixture, resolve_bracket)
+from padel_core.ingest import IngestError, parse_results, resolve_results
+from padel_core.profiling import DEFAULT_DUMP_PATH, DUMP_PATH_ENV_VAR, NULL_PROFILER, Profiler, instrument_streamlit, profiling_enabled
+from padel_core.simulation import SCORE_KIND_SET, SCORE_KIND_TOTAL, STRENGTH_EQUAL, STRENGTH_FORM, ScoreModel, positions_dataframe, simulate_positions
+from padel_core import generate_americano_fixture as core_americano_fixture, generate_round_robin_pairs_fixture as core_round_robin_fixture
 
 # --- Constantes ---
 TOURNAMENT_TYPE_AMERICANO = "Americano (Parejas Rotativas)"
 TOURNAMENT_TYPE_PAREJAS_FIJAS = "Parejas Fijas (Round Robin)"
 PAIRING_METHOD_RANDOM = "Sorteo Aleatorio"
 PAIRING_METHOD_MANUAL = "Selección Manual"
+VIEW_RESULTS = "📝 Rondas y Resultados"
+VIEW_STANDINGS = "📊 Clasificación"
+VIEW_SIMULATION = "🎲 Probabilidades"
+VIEW_KNOCKOUT = "🏆 Eliminatoria"
+SCORE_KIND_LABELS = {SCORE_KIND_SET: "Set (ganador a N juegos)", SCORE_KIND_TOTAL: "N juegos totales"}
+STRENGTH_LABELS = {STRENGTH_EQUAL: "Igualados (50 %)", STRENGTH_FORM: "Según forma (% juegos ganados)"}
+DEFAULT_DB_PATH = "torneos.db"
 
-# --- Funciones de Generación de Fixture ---
-
-def generate_round_robin_pairs_fixture(pairs_list, num_courts):
-    """
-    Genera un fixture Round Robin para parejas fijas usando el algoritmo
-    estándar (método del círculo), adaptado para parejas.
-    Garantiza N-1 rondas con N/2 partidos por ronda si N (nº parejas) es par.
-    """
-    num_pairs = len(pairs_list)
-    if num_pairs < 2:
-        st.warning("Se necesitan al menos 2 parejas para generar un fixture.")
-        return {"rounds": []}
-
-    fixture = {"rounds": []}
-    working_pairs_list = list(pairs_list)
-    is_odd = False
-    if num_pairs % 2 != 0:
-        working_pairs_list.append("BYE"); num_pairs += 1; is_odd = True
-
-    n = num_pairs; num_rounds = n - 1; matches_per_round_algo = n // 2
-    matches_per_round_display = min(num_courts, matches_per_round_algo)
-    if matches_per_round_display <= 0:
-        st.warning(f"No se pueden jugar partidos con {num_courts} pistas y {len(pairs_list)} parejas."); return {"rounds": []}
-
-    rotating_items = deque(working_pairs_list)
-    all_original_pair_names = {f"{p[0]}/{p[1]}" for p in pairs_list} # Nombres de las parejas originales
-
-    for round_num in range(1, num_rounds + 1):
-        round_matches_data_algo = []; pairs_playing_this_round_algo = set()
-        current_round_deque = rotating_items.copy()
-        for i in range(matches_per_round_algo):
-            item1 = current_round_deque[i]; item2 = current_round_deque[n - 1 - i]
-            if item1 != "BYE" and item2 != "BYE":
-                 if isinstance(item1, tuple) and isinstance(item2, tuple):
-                    round_matches_data_algo.append({"pair1": item1, "pair2": item2, "score1": None, "score2": None})
-                    pairs_playing_this_round_algo.add(f"{item1[0]}/{item1[1]}"); pairs_playing_this_round_algo.add(f"{item2[0]}/{item2[1]}")
-                 else: st.error(f"Error RR interno: {item1} vs {item2}")
-
-        final_round_matches_display = []; pairs_playing_names_display = set()
-        # Opcional: random.shuffle(round_matches_data_algo)
-        for court_idx, match_data in enumerate(round_matches_data_algo):
-             if court_idx < matches_per_round_display:
-                 match_data["court"] = court_idx + 1; final_round_matches_display.append(match_data)
-                 pairs_playing_names_display.add(f"{match_data['pair1'][0]}/{match_data['pair1'][1]}"); pairs_playing_names_display.add(f"{match_data['pair2'][0]}/{match_data['pair2'][1]}")
-
-        resting_pairs_names = list(all_original_pair_names - pairs_playing_names_display)
-        if final_round_matches_display:
-            fixture["rounds"].append({"round_num": round_num, "matches": final_round_matches_display, "resting": resting_pairs_names})
-
-        if len(rotating_items) > 1: last_item = rotating_items.pop(); rotating_items.insert(1, last_item)
-
-    if "rounds" not in fixture: fixture["rounds"] = []
-    elif not fixture["rounds"] and len(pairs_list)>=2: st.warning("Fixture RR generado sin rondas asignadas.")
+# --- Funciones de Generación de Fixture (lógica en padel_core, avisos en la UI) ---
+def generate_round_robin_pairs_fixture(pairs_list, num_courts, num_groups=1):
+    """Genera el fixture Round Robin de parejas fijas (o la fase de grupos) y muestra los avisos del generador."""
+    try:
+        with get_profiler().stage("fixture"):
+            fixture = core_round_robin_fixture(pairs_list, num_courts) if num_groups <= 1 else generate_group_fixture(pairs_list, num_groups, num_courts, is_pairs=True)
+    except FixtureError as exc: st.warning(str(exc)); return {"rounds": []}
+    for msg in fixture.pop("warnings", []): st.warning(msg)
     return fixture
 
-# --- Función generate_americano_fixture (sin cambios) ---
-def generate_americano_fixture(players, num_courts):
-    """Genera un fixture Americano SIMPLIFICADO (rotación aleatoria)."""
-    num_players = len(players)
-    if num_players < 4: st.warning("Min 4 jugadores para Americano."); return {"rounds": []}
-    fixture = {"rounds": []}; all_players = list(players); played_pairs_history = set()
-    num_rounds = max(1, num_players - 1)
-    for _ in range(num_rounds):
-        round_matches = []; players_this_round = list(all_players); random.shuffle(players_this_round)
-        max_matches_in_round = min(num_courts, len(players_this_round) // 4)
-        if max_matches_in_round <= 0: continue
-        possible_pairs = list(combinations(players_this_round, 2)); random.shuffle(possible_pairs)
-        potential_pairs = []; players_already_paired = set()
-        for p1, p2 in possible_pairs:
-            pair_tuple = tuple(sorted((p1, p2))); priority = 1 if pair_tuple not in played_pairs_history else 0
-            if p1 not in players_already_paired and p2 not in players_already_paired: potential_pairs.append((priority, pair_tuple))
-        potential_pairs.sort(key=lambda x: x[0], reverse=True)
-        final_round_pairs = []; players_in_final_pairs = set()
-        for _, pair_tuple in potential_pairs:
-            p1, p2 = pair_tuple
-            if p1 not in players_in_final_pairs and p2 not in players_in_final_pairs: final_round_pairs.append(pair_tuple); players_in_final_pairs.add(p1); players_in_final_pairs.add(p2)
-        match_count = 0; assigned_players_in_match = set(); available_pairs_for_match = list(final_round_pairs); random.shuffle(available_pairs_for_match)
-        while match_count < max_matches_in_round and len(available_pairs_for_match) >= 2:
-            pair1 = available_pairs_for_match.pop(0); found_opponent = False
-            for i in range(len(available_pairs_for_match)):
-                pair2 = available_pairs_for_match[i]
-                if not set(pair1) & set(pair2):
-                    available_pairs_for_match.pop(i); played_pairs_history.add(tuple(sorted(pair1))); played_pairs_history.add(tuple(sorted(pair2)))
-                    round_matches.append({"court":match_count+1,"pair1":pair1,"pair2":pair2,"score1":None,"score2":None})
-                    assigned_players_in_match.update(pair1); assigned_players_in_match.update(pair2); match_count+=1; found_opponent=True; break
-        players_resting=[p for p in all_players if p not in assigned_players_in_match]
-        if round_matches: fixture["rounds"].append({"round_num":len(fixture["rounds"])+1,"matches":round_matches,"resting":players_resting})
-    if "rounds" not in fixture: fixture["rounds"] = []
-    elif not fixture["rounds"] and num_players>=4: st.warning("No se pudieron generar rondas Americano.")
-    return fixture
+def generate_americano_fixture(players, num_courts, full_rounds=False, num_groups=1):
+    """Genera un fixture Americano con rotación de compañeros y descansos equilibrados (o la fase de grupos)."""
+    try:
+        with get_profiler().stage("fixture"):
+            if num_groups > 1: return generate_group_fixture(players, num_groups, num_courts)
+            return core_americano_fixture(players, num_courts, full_rounds=full_rounds)
+    except FixtureError as exc: st.warning(str(exc)); return {"rounds": []}
 
-# --- Funciones de Cálculo de Clasificación (sin cambios) ---
-def calculate_standings_americano(players, fixture_data):
-    """Calcula la clasificación individual para torneo Americano."""
-    standings = {p: {"JG": 0, "JR": 0, "DG": 0, "PG": 0, "PP": 0, "PE": 0, "PJ": 0} for p in players}
-    if not fixture_data or 'rounds' not in fixture_data: return standings, []
-    for p in players: standings[p] = {"JG": 0, "JR": 0, "DG": 0, "PG": 0, "PP": 0, "PE": 0, "PJ": 0}
-    processed_match_ids_for_stats = set()
-    for round_idx, round_data in enumerate(fixture_data.get('rounds',[])):
-        for match_idx, match in enumerate(round_data.get('matches', [])):
-            match_id = f"r{round_data.get('round_num', '?')}_m{match_idx}"
-            score1 = st.session_state.get(f"score1_{match_id}"); score2 = st.session_state.get(f"score2_{match_id}")
-            s1 = int(score1) if score1 is not None else None; s2 = int(score2) if score2 is not None else None
-            if s1 is not None and s2 is not None:
-                 if 'pair1' not in match or 'pair2' not in match or not isinstance(match['pair1'],(list, tuple)) or len(match['pair1'])!=2 or not isinstance(match['pair2'],(list, tuple)) or len(match['pair2'])!=2: continue
-                 pair1, pair2 = match['pair1'], match['pair2']
-                 if not all(p in standings for p in pair1) or not all(p in standings for p in pair2): continue
-                 for p in pair1: standings[p]['JG'] += s1; standings[p]['JR'] += s2
-                 for p in pair2: standings[p]['JG'] += s2; standings[p]['JR'] += s1
-                 if match_id not in processed_match_ids_for_stats:
-                    if s1 > s2:   res1, res2 = 'PG', 'PP'
-                    elif s2 > s1: res1, res2 = 'PP', 'PG'
-                    else:         res1, res2 = 'PE', 'PE'
-                    for p in pair1: standings[p]['PJ'] += 1; standings[p][res1] += 1
-                    for p in pair2: standings[p]['PJ'] += 1; standings[p][res2] += 1
-                    processed_match_ids_for_stats.add(match_id)
-    for p in players: standings[p]['DG'] = standings[p]['JG'] - standings[p]['JR']
-    sorted_players = sorted(players, key=lambda p: (standings[p]['PG'], standings[p]['DG'], standings[p]['JG']), reverse=True)
-    return standings, sorted_players
-
-def calculate_standings_pairs(pairs, fixture_data):
-    """Calcula la clasificación por parejas para torneo Round Robin."""
-    pair_names = {f"{p[0]}/{p[1]}" for p in pairs}
-    standings = {name: {"JG": 0, "JR": 0, "DG": 0, "PG": 0, "PP": 0, "PE": 0, "PJ": 0} for name in pair_names}
-    if not fixture_data or 'rounds' not in fixture_data: return standings, []
-    for name in pair_names: standings[name] = {"JG": 0, "JR": 0, "DG": 0, "PG": 0, "PP": 0, "PE": 0, "PJ": 0}
-    processed_match_ids_for_stats = set()
-    for round_idx, round_data in enumerate(fixture_data.get('rounds', [])):
-        for match_idx, match in enumerate(round_data.get('matches', [])):
-            match_id = f"r{round_data.get('round_num','?')}_m{match_idx}"
-            score1 = st.session_state.get(f"score1_{match_id}"); score2 = st.session_state.get(f"score2_{match_id}")
-            s1 = int(score1) if score1 is not None else None; s2 = int(score2) if score2 is not None else None
-            if s1 is not None and s2 is not None:
-                if 'pair1' not in match or 'pair2' not in match or not isinstance(match['pair1'],(list, tuple)) or len(match['pair1'])!=2 or not isinstance(match['pair2'],(list, tuple)) or len(match['pair2'])!=2: continue
-                pair1_tuple, pair2_tuple = match['pair1'], match['pair2']; pair1_name = f"{pair1_tuple[0]}/{pair1_tuple[1]}"; pair2_name = f"{pair2_tuple[0]}/{pair2_tuple[1]}"
-                if pair1_name not in standings or pair2_name not in standings: continue
-                standings[pair1_name]['JG'] += s1; standings[pair1_name]['JR'] += s2; standings[pair2_name]['JG'] += s2; standings[pair2_name]['JR'] += s1
-                if match_id not in processed_match_ids_for_stats:
-                    standings[pair1_name]['PJ'] += 1; standings[pair2_name]['PJ'] += 1
-                    if s1 > s2:   standings[pair1_name]['PG'] += 1; standings[pair2_name]['PP'] += 1
-                    elif s2 > s1: standings[pair1_name]['PP'] += 1; standings[pair2_name]['PG'] += 1
-                    else:         standings[pair1_name]['PE'] += 1; standings[pair2_name]['PE'] += 1
-                    processed_match_ids_for_stats.add(match_id)
-    for name in pair_names: standings[name]['DG'] = standings[name]['JG'] - standings[name]['JR']
-    sorted_pair_names = sorted(pair_names, key=lambda name: (standings[name]['PG'], standings[name]['DG'], standings[name]['JG']), reverse=True)
-    return standings, sorted_pair_names
-
-# --- Funciones de Formateo y UI Auxiliares (sin cambios) ---
-def generate_standings_text(standings_data, sorted_keys, tournament_name, is_pairs=False):
-    entity_label = "Pareja" if is_pairs else "Jugador"; header = f"--- CLASIFICACIÓN: {tournament_name} ({entity_label}) ---\n"; separator = "-"*75+"\n"; col_headers = f"{'Pos':<4} {entity_label:<30} {'PJ':<4} {'PG':<4} {'PE':<4} {'PP':<4} {'JG':<6} {'JR':<6} {'DG':<6}\n"
-    lines = [header, separator, col_headers, separator]
-    for i, key in enumerate(sorted_keys):
-        stats = standings_data.get(key, {}); lines.append(f"{i+1:<4} {key:<30} {stats.get('PJ',0):<4} {stats.get('PG',0):<4} {stats.get('PE',0):<4} {stats.get('PP',0):<4} {stats.get('JG',0):<6} {stats.get('JR',0):<6} {stats.get('DG',0):<6}\n")
-    lines.append(separator); return "".join(lines)
+# --- Funciones de UI Auxiliares ---
+def get_profiler():
+    """Perfilador de la sesión si la instrumentación está activa (PADEL_PROFILE=1 o ?profile=1); si no, uno que no hace nada."""
+    if not (profiling_enabled(os.environ) or st.query_params.get("profile") == "1"): return NULL_PROFILER
+    if 'profiler' not in st.session_state: st.session_state.profiler = Profiler()
+    return st.session_state.profiler
 
 def display_player_inputs(num_players_to_show):
     player_names_inputs = {}; st.subheader("Nombres Jugadores"); cols_players = st.columns(3)
@@ -173,14 +56,211 @@ def display_player_inputs(num_players_to_show):
         player_names_inputs[i] = player_name; st.session_state.player_inputs[i] = player_name
     return player_names_inputs
 
+@st.cache_resource
+def get_tournament_store():
+    """Almacén SQLite compartido por todas las sesiones del servidor (ruta en PADEL_DB_PATH)."""
+    return TournamentStore(os.environ.get("PADEL_DB_PATH", DEFAULT_DB_PATH))
+
+def ledger_entities(is_pairs):
+    return [f"{p[0]}/{p[1]}" for p in st.session_state.pairs] if is_pairs else list(st.session_state.players)
+
+def reset_tournament_state():
+    """Olvida el libro de clasificación y el ID guardado antes de generar un fixture nuevo."""
+    st.session_state.standings_ledger = None; st.session_state.tournament_id = None
+
+def resume_tournament(tournament_id):
+    """Carga un torneo guardado en la sesión y pasa a la fase de visualización. Devuelve False si no existe."""
+    data = get_tournament_store().load_tournament(tournament_id)
+    if data is None: return False
+    st.session_state.config = data['config']; st.session_state.tournament_type = data['tournament_type']
+    st.session_state.players = data['players']; st.session_state.pairs = data['pairs']; st.session_state.fixture = data['fixture']
+    is_pairs = data['tournament_type'] == TOURNAMENT_TYPE_PAREJAS_FIJAS
+    st.session_state.standings_ledger = StandingsLedger.from_scores(ledger_entities(is_pairs), data['fixture'], data['scores'], is_pairs)
+    st.session_state.standings_view_cache = None; st.session_state.tournament_id = tournament_id
+    st.session_state.app_phase = 'viewing'; st.query_params["torneo"] = str(tournament_id)
+    return True
+
+def get_standings_ledger(is_pairs):
+    """Devuelve el libro de clasificación de la sesión; si falta, lo crea con los marcadores ya introducidos."""
+    if st.session_state.get('standings_ledger') is None:
+        st.session_state.standings_ledger = StandingsLedger.from_scores(ledger_entities(is_pairs), st.session_state.fixture, st.session_state, is_pairs)
+        st.session_state.standings_view_cache = None
+    return st.session_state.standings_ledger
+
+def on_score_change(match_id, side1, side2):
+    """Callback de los marcadores: aplica al libro solo la diferencia del partido editado."""
+    ledger = st.session_state.get('standings_ledger')
+    s1, s2 = st.session_state.get(f"score1_{match_id}"), st.session_state.get(f"score2_{match_id}")
+    if ledger is not None and ledger.apply(match_id, side1, side2, s1, s2) and st.session_state.get('tournament_id'):
+        get_tournament_store().queue_result(st.session_state.tournament_id, match_id, s1, s2) # Escritura en segundo plano
+
+def apply_results_batch(results, persist=True):
+    """Aplica un lote validado {match_id: (s1, s2)} en una sola actualización de estado y de clasificación; con `persist` lo encola para guardarlo."""
+    changed = st.session_state.standings_ledger.apply_many(results)
+    for match_id in results: # Los marcadores visibles se reinician desde el libro
+        st.session_state.pop(f"score1_{match_id}", None); st.session_state.pop(f"score2_{match_id}", None)
+    if persist and changed and st.session_state.get('tournament_id'): get_tournament_store().queue_results(st.session_state.tournament_id, results)
+    return changed
+
+def on_import_results():
+    """Callback de importación: valida el fichero subido contra el fixture y lo aplica entero o nada."""
+    uploaded = st.session_state.get('results_upload')
+    if uploaded is None: st.session_state.import_feedback = ("warning", "Selecciona un fichero CSV o JSON."); return
+    try: updates = resolve_results(parse_results(uploaded.getvalue(), uploaded.name.rsplit('.', 1)[-1]), st.session_state.fixture)
+    except IngestError as exc: st.session_state.import_feedback = ("error", "No se ha aplicado ningún resultado:\n" + "\n".join(f"- {e}" for e in exc.errors[:20])); return
+    st.session_state.import_feedback = ("success", f"{len(updates)} resultados importados ({apply_results_batch(updates)} con cambios).")
+
+def on_sync_results():
+    """Callback: trae los resultados guardados (p. ej. recibidos por el endpoint HTTP) en un solo paso."""
+    store = get_tournament_store()
+    if not store.flush(): # Sin los marcadores de esta sesión en el almacén, sincronizar pisaría los más recientes
+        st.session_state.import_feedback = ("error", f"No se ha sincronizado: hay marcadores sin guardar ({store.last_error or 'tiempo de espera agotado'})."); return
+    # Solo la diferencia con el libro, sin reescribirla: lo guardado ya es lo último (incluidos los borrados)
+    stored = store.load_results(st.session_state.tournament_id); current = st.session_state.standings_ledger.results()
+    updates = {match_id: scores for match_id, scores in stored.items() if current.get(match_id) != scores}
+    updates.update({match_id: (None, None) for match_id in current if match_id not in stored})
+    try: changed = apply_results_batch(updates, persist=False)
+    except ValueError as exc: st.session_state.import_feedback = ("error", f"No se ha sincronizado ningún resultado: {exc}"); return
+    st.session_state.import_feedback = ("success", f"Sincronizado: {changed} partidos actualizados.")
+
+def on_replan(is_pairs):
+    """Callback: conserva las rondas ya jugadas y regenera las pendientes con las altas, bajas y pistas indicadas."""
+    ss = st.session_state; frozen = ss.replan_freeze; results = ss.standings_ledger.results()
+    new_names = [n.strip() for n in ss.get('replan_join', '').splitlines() if n.strip()]
+    try:
+        if is_pairs:
+            new_pairs = [tuple(sorted(p.strip() for p in n.split('/'))) for n in new_names]
+            if any(len(p) != 2 or not all(p) for p in new_pairs): raise FixtureError("Las parejas nuevas van como 'Jugador A/Jugador B', una por línea.")
+            players = ss.players + [p for pair in new_pairs for p in pair]; pairs = ss.pairs + new_pairs
+        else: players = ss.players + new_names; pairs = ss.pairs
+        if len(set(players)) != len(players): raise FixtureError("Hay nombres de jugador repetidos.")
+        with get_profiler().stage("replan"):
+            if is_pairs: fixture = replan_round_robin_pairs_fixture(ss.fixture, pairs, ss.replan_courts, frozen, ss.replan_withdraw)
+            else: fixture = replan_americano_fixture(ss.fixture, players, ss.replan_courts, frozen, ss.replan_withdraw, remaining_rounds=ss.replan_rounds, full_rounds=ss.config.get('full_rounds', False))
+    except FixtureError as exc: ss.replan_feedback = ("error", str(exc)); return
+    warnings = fixture.pop("warnings", []); config = {**ss.config, 'num_courts': ss.replan_courts}
+    # Se guarda antes de tocar la sesión: si falla, el torneo sigue como estaba
+    try:
+        if ss.get('tournament_id'): get_tournament_store().save_replan(ss.tournament_id, config, players, pairs, fixture, frozen + 1)
+    except StoreError as exc: ss.replan_feedback = ("error", f"No se ha replanificado: {exc}"); return
+    for key in [k for k in ss.keys() if k.startswith('score1_') or k.startswith('score2_')]: del ss[key] # Los marcadores se vuelven a leer del libro
+    ss.players = players; ss.pairs = pairs; ss.fixture = fixture; ss.config = config
+    ss.standings_ledger = StandingsLedger.from_scores(ledger_entities(is_pairs), fixture, {f"score{k}_{mid}": s[k - 1] for mid, s in results.items() for k in (1, 2)}, is_pairs)
+    ss.standings_view_cache = None; ss.simulation_result = None; ss.pop('view_round', None); ss.replan_join = ""; ss.replan_withdraw = []
+    ss.replan_feedback = ("success", f"Replanificado: se conservan {frozen} rondas y se generan {len(fixture['rounds']) - frozen} nuevas." + "".join(f"\n- {w}" for w in warnings))
+
+def render_replan_panel(is_pairs, ledger):
+    """Altas, bajas y cambio de pistas a mitad de torneo sin perder los resultados."""
+    rounds = st.session_state.fixture['rounds']; min_frozen = frozen_round_count(st.session_state.fixture, ledger.results())
+    withdrawn = st.session_state.fixture.get('withdrawn', [])
+    active = [e for e in ledger_entities(is_pairs) if e not in withdrawn]
+    st.caption(f"Se conservan las rondas ya jugadas (hasta la {min_frozen} como mínimo) con sus resultados; el resto se vuelve a generar." + (f" Retirados: {', '.join(withdrawn)}." if withdrawn else ""))
+    col_freeze, col_courts = st.columns(2)
+    col_freeze.number_input("Conservar hasta la ronda", min_value=min_frozen, max_value=len(rounds), value=min_frozen, key='replan_freeze')
+    col_courts.number_input("Pistas disponibles", min_value=1, value=int(st.session_state.config.get('num_courts', 1)), key='replan_courts')
+    st.multiselect("Se retiran", active, key='replan_withdraw')
+    st.text_area("Se incorporan (una pareja 'A/B' por línea)" if is_pairs else "Se incorporan (un jugador por línea)", key='replan_join')
+    if not is_pairs: st.number_input("Rondas a generar", min_value=0, value=max(0, len(rounds) - min_frozen), key='replan_rounds')
+    st.button("🔁 Replanificar rondas pendientes", on_click=on_replan, args=(is_pairs,))
+    feedback = st.session_state.pop('replan_feedback', None)
+    if feedback: getattr(st, feedback[0])(feedback[1])
+
+def on_build_knockout(is_pairs):
+    """Callback: arma el cuadro de eliminatoria con los primeros de cada grupo (siembra cruzada)."""
+    ss = st.session_state
+    try:
+        qualifiers = group_qualifiers(ss.standings_ledger.sorted_keys(), ss.fixture['groups'], ss.ko_per_group)
+        ss.fixture['knockout'] = knockout_bracket(qualifiers if is_pairs else playoff_pairs(qualifiers))
+    except FixtureError as exc: ss.knockout_feedback = ("error", str(exc)); return
+    if ss.get('tournament_id'): get_tournament_store().save_fixture_meta(ss.tournament_id, ss.fixture)
+
+def knockout_key(side, match_id, entry1, entry2):
+    """Clave del widget de un marcador de la eliminatoria: incluye los contendientes, para que no se arrastre a otro cruce."""
+    return f"ko{side}_{match_id}_{entry1}_{entry2}"
+
+def on_knockout_score(match_id, entry1, entry2):
+    """Callback de los marcadores de la eliminatoria: se guardan (con los dos contendientes) con el resto de datos del fixture."""
+    ss = st.session_state
+    ss.fixture['knockout']['scores'][match_id] = bracket_score(ss[knockout_key(1, match_id, entry1, entry2)], ss[knockout_key(2, match_id, entry1, entry2)], entry1, entry2)
+    if ss.get('tournament_id'): get_tournament_store().save_fixture_meta(ss.tournament_id, ss.fixture)
+
+def on_discard_knockout():
+    ss = st.session_state; ss.fixture.pop('knockout', None)
+    for key in [k for k in ss.keys() if k.startswith('ko1_') or k.startswith('ko2_')]: del ss[key]
+    if ss.get('tournament_id'): get_tournament_store().save_fixture_meta(ss.tournament_id, ss.fixture)
+
+def render_knockout(is_pairs):
+    """Cuadro de eliminatoria: se arma desde la clasificación de los grupos y avanza con cada marcador."""
+    bracket = st.session_state.fixture.get('knockout')
+    if bracket is None:
+        smallest = min(len(g) for g in st.session_state.fixture['groups'])
+        st.number_input("Clasifican por grupo", 1, smallest, value=min(2, smallest), key='ko_per_group')
+        st.caption("Pasan los primeros de cada grupo: todos los 1º por orden de grupo, luego los 2º, etc.; el cuadro se completa con exenciones para los mejores sembrados." + ("" if is_pairs else " En Americano se forman parejas: el mejor clasificado con el peor, y así sucesivamente."))
+        st.button("🏆 Generar cuadro de eliminatoria", on_click=on_build_knockout, args=(is_pairs,))
+        feedback = st.session_state.pop('knockout_feedback', None)
+        if feedback: getattr(st, feedback[0])(feedback[1])
+        return
+    rounds = resolve_bracket(bracket)
+    for round_data in rounds:
+        st.markdown(f"**{round_data['label']}**")
+        for match in round_data['matches']:
+            entry1, entry2, match_id = match['entry1'], match['entry2'], match['match_id']
+            if entry1 is None or entry2 is None:
+                if match['winner'] is not None: st.caption(f"{match['winner']} pasa sin jugar")
+                else: st.caption("Por decidir")
+                continue
+            s1, s2 = match['score'] or (0, 0); args = (match_id, entry1, entry2)
+            col_match, col_score1, col_score2 = st.columns([3, 1, 1])
+            col_match.markdown(f"{entry1} **vs** {entry2}" + (f" → **{match['winner']}**" if match['winner'] else ""))
+            col_score1.number_input(f"G {entry1}", 0, MAX_SCORE, value=s1, step=1, key=knockout_key(1, *args), label_visibility="collapsed", on_change=on_knockout_score, args=args)
+            col_score2.number_input(f"G {entry2}", 0, MAX_SCORE, value=s2, step=1, key=knockout_key(2, *args), label_visibility="collapsed", on_change=on_knockout_score, args=args)
+    champion = rounds[-1]['matches'][0]['winner'] if rounds else None
+    if champion: st.success(f"🏆 Campeón: {champion}")
+    st.button("Descartar cuadro", on_click=on_discard_knockout)
+
+@st.fragment
+def render_match(round_num, match_idx, match, is_pairs, group=None):
+    """Dibuja un partido y sus marcadores. Es un fragmento: editar un marcador solo recarga este partido."""
+    fragment_start = time.perf_counter()
+    p1_tuple, p2_tuple = match['pair1'], match['pair2']
+    p1_name, p2_name = f"{p1_tuple[0]}/{p1_tuple[1]}", f"{p2_tuple[0]}/{p2_tuple[1]}"
+    col_match, col_score1, col_score2 = st.columns([3, 1, 1])
+    with col_match: st.markdown(f"**Pista {match.get('court', '?')}**{f' · Grupo {group}' if group else ''}: {p1_name} **vs** {p2_name}")
+    match_id = f"r{round_num}_m{match_idx}"; score1_key, score2_key = f"score1_{match_id}", f"score2_{match_id}"
+    side1, side2 = match_sides(match, is_pairs)
+    # El valor inicial sale del libro: las claves de widgets no dibujados las borra Streamlit entre recargas
+    s1, s2 = st.session_state.standings_ledger.result(match_id) or (0, 0)
+    with col_score1:
+        st.number_input(f"G {p1_name}", 0, MAX_SCORE, key=score1_key, step=1, format="%d", label_visibility="collapsed", value=s1, on_change=on_score_change, args=(match_id, side1, side2))
+    with col_score2:
+        st.number_input(f"G {p2_name}", 0, MAX_SCORE, key=score2_key, step=1, format="%d", label_visibility="collapsed", value=s2, on_change=on_score_change, args=(match_id, side1, side2))
+    st.divider()
+    fragment_ms = (time.perf_counter() - fragment_start) * 1000; st.session_state.setdefault('rerun_timings_ms', {})['match'] = fragment_ms
+    prof = get_profiler(); prof.record("match_fragment", fragment_ms)
+    if not prof.in_rerun: prof.end_rerun(fragment_ms, "fragment_rerun") # Recarga solo del fragmento: su propia muestra
+
+def render_round(round_data, is_pairs, group_of=None):
+    """Dibuja la cabecera de una ronda y un fragmento por partido (`group_of`: entidad -> grupo, si hay grupos)."""
+    st.markdown(f"**Ronda {round_data.get('round_num', '?')}**")
+    if round_data.get('resting'): resting_label = "Descansan" ; st.caption(f"{resting_label}: {', '.join(round_data['resting'])}") # Simplificado
+    if not round_data.get('matches'): st.info("No hay partidos en esta ronda."); return
+    for match_idx, match in enumerate(round_data.get('matches', [])):
+        sides = match_sides(match, is_pairs)
+        if sides is None: continue
+        render_match(round_data.get('round_num', '?'), match_idx, match, is_pairs, group_of.get(sides[0][0]) if group_of else None)
+
 # --- Interfaz Principal de Streamlit ---
+_rerun_start = time.perf_counter()
 
 st.set_page_config(page_title="Gestor Torneos Pádel", layout="wide"); st.title("🏓 Gestor de Torneos de Pádel")
+prof = get_profiler(); prof.begin_rerun()
+# Con el perfilado activo, `st` cuenta los widgets y las lecturas de session_state de toda la app (callbacks y fragmentos incluidos)
+st = instrument_streamlit(st, prof)
 
 # --- Inicialización del Estado de Sesión (CORREGIDO) ---
 if 'app_phase' not in st.session_state:
     st.session_state.app_phase = 'config_base'
-    st.session_state.config = {'num_players': 8, 'num_courts': 2, 'name': "Torneo Pádel"}
+    st.session_state.config = {'num_players': 8, 'num_courts': 2, 'name': "Torneo Pádel", 'match_minutes': 20}
     st.session_state.players = []
     st.session_state.pairs = []
     st.session_state.fixture = None
@@ -188,6 +268,8 @@ if 'app_phase' not in st.session_state:
     st.session_state.pairing_method = None
     st.session_state.player_inputs = {}
     st.session_state.manual_pair_selections = {}
+    st.session_state.standings_ledger = None
+    st.session_state.tournament_id = None
     # --- CORRECCIÓN AQUÍ ---
     # 1. Identificar las claves a borrar
     score_keys_to_delete = [k for k in st.session_state.keys() if k.startswith('score1_') or k.startswith('score2_')]
@@ -196,6 +278,9 @@ if 'app_phase' not in st.session_state:
         if k in st.session_state: # Buena práctica verificar si aún existe
             del st.session_state[k]
     # --- FIN CORRECCIÓN ---
+    # Un torneo guardado en la URL (?torneo=ID) sobrevive a recargas del navegador y reinicios del servidor
+    torneo_param = st.query_params.get("torneo")
+    if torneo_param and torneo_param.isdigit() and not resume_tournament(int(torneo_param)): st.query_params.clear()
 
 
 # --- FASE 0: Configuración Base (sin cambios) ---
@@ -205,10 +290,19 @@ if st.session_state.app_phase == 'config_base':
         conf_name = st.text_input("Nombre Torneo", st.session_state.config.get('name',"Torneo Pádel")); col1,col2=st.columns(2)
         with col1: conf_num_players = st.number_input("Nº Jugadores", 4, step=1, value=st.session_state.config.get('num_players', 8))
         with col2: conf_num_courts = st.number_input("Nº Pistas", 1, step=1, value=st.session_state.config.get('num_courts', 2))
+        conf_match_minutes = st.number_input("Minutos por partido (para estimar la duración)", 5, 180, step=5, value=st.session_state.config.get('match_minutes', 20))
         submitted = st.form_submit_button("Confirmar Configuración Base")
         if submitted:
             if conf_num_players < 4: st.error("Mínimo 4 jugadores.")
-            else: st.session_state.config['name']=conf_name; st.session_state.config['num_players']=conf_num_players; st.session_state.config['num_courts']=conf_num_courts; st.session_state.app_phase='config_players'; st.rerun()
+            else: st.session_state.config['name']=conf_name; st.session_state.config['num_players']=conf_num_players; st.session_state.config['num_courts']=conf_num_courts; st.session_state.config['match_minutes']=conf_match_minutes; st.session_state.app_phase='config_players'; st.rerun()
+    saved_tournaments = get_tournament_store().list_tournaments()
+    if saved_tournaments:
+        with st.expander("📂 Reanudar torneo guardado"):
+            labels = {tid: f"#{tid} - {name}" for tid, name, _ in saved_tournaments}
+            resume_id = st.selectbox("Torneo", list(labels), format_func=labels.get)
+            if st.button("Reanudar"):
+                if resume_tournament(resume_id): st.rerun()
+                else: st.error(f"No se encontró el torneo #{resume_id}.")
 
 # --- FASE 1: Ingreso de Nombres (sin cambios) ---
 elif st.session_state.app_phase == 'config_players':
@@ -228,6 +322,8 @@ elif st.session_state.app_phase == 'config_players':
 elif st.session_state.app_phase == 'config_pairing':
     st.header("3. Formato y Parejas"); st.info(f"**Torneo:** {st.session_state.config.get('name')} | **Jugadores ({len(st.session_state.players)}):** {', '.join(st.session_state.players)} | **Pistas:** {st.session_state.config.get('num_courts')}")
     ttype = st.radio("Selecciona formato:", (TOURNAMENT_TYPE_AMERICANO, TOURNAMENT_TYPE_PAREJAS_FIJAS), key='tt_radio', horizontal=True, index=0 if st.session_state.tournament_type!=TOURNAMENT_TYPE_PAREJAS_FIJAS else 1); st.session_state.tournament_type=ttype
+    max_groups = max(1, len(st.session_state.players) // 4)
+    st.session_state.config['groups'] = st.number_input("Nº de grupos", 1, max_groups, key='cfg_groups', help="Con más de un grupo se juega una fase de grupos (cabezas de serie según el orden de alta, repartidas en serpiente) en las mismas pistas y después una eliminatoria con los primeros de cada grupo.")
     if ttype == TOURNAMENT_TYPE_PAREJAS_FIJAS:
         if len(st.session_state.players)%2!=0: st.error(f"Nº par requerido ({len(st.session_state.players)}) para Parejas Fijas.");
         else:
@@ -254,7 +350,7 @@ elif st.session_state.app_phase == 'config_pairing':
                         elif len(f_assigned)!=len(st.session_state.players): st.error(f"No asignados todos ({len(f_assigned)}/{len(st.session_state.players)}).")
                         elif len(set(f_pairs))!=len(f_pairs): st.error("Parejas duplicadas.")
                         else:
-                            st.session_state.pairs=f_pairs; st.session_state.fixture=generate_round_robin_pairs_fixture(st.session_state.pairs,st.session_state.config['num_courts'])
+                            st.session_state.pairs=f_pairs; reset_tournament_state(); st.session_state.fixture=generate_round_robin_pairs_fixture(st.session_state.pairs,st.session_state.config['num_courts'],st.session_state.config.get('groups', 1))
                             if st.session_state.fixture and st.session_state.fixture.get('rounds'): st.session_state.app_phase='viewing'; st.success("OK"); st.rerun()
                             else: st.error("Error generando fixture RR.")
             elif pmethod == PAIRING_METHOD_RANDOM:
@@ -263,14 +359,16 @@ elif st.session_state.app_phase == 'config_pairing':
                     pl=list(st.session_state.players); random.shuffle(pl); r_pairs=[tuple(sorted((pl[i],pl[i+1]))) for i in range(0,len(pl),2)]
                     if len(r_pairs)==len(st.session_state.players)//2:
                          st.session_state.pairs=r_pairs; st.success("Parejas:"); [st.write(f"- {p1}/{p2}") for p1,p2 in st.session_state.pairs]
-                         st.session_state.fixture=generate_round_robin_pairs_fixture(st.session_state.pairs,st.session_state.config['num_courts'])
+                         reset_tournament_state(); st.session_state.fixture=generate_round_robin_pairs_fixture(st.session_state.pairs,st.session_state.config['num_courts'],st.session_state.config.get('groups', 1))
                          if st.session_state.fixture and st.session_state.fixture.get('rounds'): st.session_state.app_phase='viewing'; st.success("Fixture RR OK"); st.rerun()
                          else: st.error("Error generando fixture RR post-sorteo.")
                     else: st.error("Error sorteo.")
     elif ttype == TOURNAMENT_TYPE_AMERICANO:
         st.markdown("**Parejas rotativas aleatorias.**")
+        full_rounds = st.checkbox("Rondas completas (juegan todos en cada ronda, repartidos en turnos de pista)", key='americano_full_rounds', help="Sin marcar, cada ronda tiene tantos partidos como pistas y el resto descansa.")
         if st.button("Generar Fixture Americano"):
-            st.session_state.fixture=generate_americano_fixture(st.session_state.players,st.session_state.config['num_courts'])
+            st.session_state.config['full_rounds'] = full_rounds
+            reset_tournament_state(); st.session_state.fixture=generate_americano_fixture(st.session_state.players,st.session_state.config['num_courts'],full_rounds,st.session_state.config.get('groups', 1))
             if st.session_state.fixture and st.session_state.fixture.get('rounds'): st.session_state.app_phase='viewing'; st.success("Fixture Americano OK"); st.rerun()
             else: st.error("Error generando fixture Americano.")
     st.divider();
@@ -289,62 +387,119 @@ elif st.session_state.app_phase == 'viewing':
         st.caption(f"{len(st.session_state.players)} jugadores | {st.session_state.config.get('num_courts', '?')} pistas")
     elif tournament_mode_display == TOURNAMENT_TYPE_AMERICANO:
          st.caption(f"{len(st.session_state.players)} jugadores | {st.session_state.config.get('num_courts', '?')} pistas | Parejas rotativas")
+         quality = st.session_state.fixture.get('quality') if st.session_state.fixture else None
+         if quality: st.caption(f"Calidad del fixture: {quality['repeated_partners']} compañeros repetidos | {quality['repeated_opponents']} rivales repetidos | Desequilibrio de descansos: {quality['rest_imbalance']}")
+
+    schedule = (st.session_state.fixture or {}).get('schedule')
+    if schedule:
+        duration = projected_duration(schedule['slots'], st.session_state.config.get('match_minutes', 20))
+        st.caption(f"🕒 {schedule['matches']} partidos en {schedule['slots']} turnos de {schedule['courts']} pistas (mínimo posible: {schedule['lower_bound']}) | Duración prevista: {int(duration // 60)} h {int(duration % 60):02d} min")
 
-    standings_data, sorted_keys = {}, []; is_classification_pairs = (st.session_state.tournament_type == TOURNAMENT_TYPE_PAREJAS_FIJAS)
+    standings_data, sorted_keys, ledger = {}, [], None; is_classification_pairs = (st.session_state.tournament_type == TOURNAMENT_TYPE_PAREJAS_FIJAS)
     if st.session_state.fixture and 'rounds' in st.session_state.fixture:
-        if is_classification_pairs:
-            if 'pairs' in st.session_state and st.session_state.pairs: standings_data, sorted_keys = calculate_standings_pairs(st.session_state.pairs, st.session_state.fixture)
-            else: st.error("Error: No se encontraron parejas para calcular clasificación.")
+        # La clasificación sale del libro incremental; los callbacks de marcador lo mantienen al día
+        if is_classification_pairs and not st.session_state.get('pairs'): st.error("Error: No se encontraron parejas para calcular clasificación.")
+        elif not is_classification_pairs and not st.session_state.get('players'): st.error("Error: No se encontraron jugadores para calcular clasificación.")
         else:
-            if 'players' in st.session_state and st.session_state.players: standings_data, sorted_keys = calculate_standings_americano(st.session_state.players, st.session_state.fixture)
-            else: st.error("Error: No se encontraron jugadores para calcular clasificación.")
+            with prof.stage("standings"): ledger = get_standings_ledger(is_classification_pairs); standings_data, sorted_keys = ledger.standings, ledger.sorted_keys()
+        if not st.session_state.get('tournament_id'):
+            st.session_state.tournament_id = get_tournament_store().save_tournament(st.session_state.config, st.session_state.tournament_type, st.session_state.players, st.session_state.pairs, st.session_state.fixture)
+            st.query_params["torneo"] = str(st.session_state.tournament_id)
+        st.caption(f"💾 Torneo #{st.session_state.tournament_id} guardado: se puede reanudar con ?torneo={st.session_state.tournament_id}")
+        if get_tournament_store().last_error: st.warning(f"⚠️ Problema al guardar marcadores: {get_tournament_store().last_error}")
     else: st.error("Error crítico: No se encontró fixture válido."); st.stop()
 
-    tab1, tab2 = st.tabs(["📝 Rondas y Resultados", "📊 Clasificación"])
-    with tab1:
+    # Solo se dibuja la vista seleccionada: cambiar de vista es una recarga completa, pero barata
+    groups = st.session_state.fixture.get('groups')
+    group_of = {e: group_name(i) for i, members in enumerate(groups) for e in members} if groups else None
+    if groups: st.caption("Grupos: " + " | ".join(f"{group_name(i)} ({len(members)})" for i, members in enumerate(groups)))
+    view = st.radio("Vista", (VIEW_RESULTS, VIEW_STANDINGS, VIEW_SIMULATION) + ((VIEW_KNOCKOUT,) if groups else ()), key='view_tab', horizontal=True, label_visibility="collapsed")
+    if view == VIEW_RESULTS:
         st.subheader("Partidos por Ronda")
         if not st.session_state.fixture or not st.session_state.fixture.get('rounds'): st.warning("No hay rondas generadas.")
         else:
             # Asegurar que las rondas estén ordenadas por número de ronda si no lo están ya
             sorted_rounds = sorted(st.session_state.fixture['rounds'], key=lambda r: r.get('round_num', 0))
-            round_tabs = st.tabs([f"Ronda {r.get('round_num', '?')}" for r in sorted_rounds])
-            for i, round_data in enumerate(sorted_rounds):
-                with round_tabs[i]:
-                    st.markdown(f"**Ronda {round_data.get('round_num', '?')}**")
-                    if round_data.get('resting'): resting_label = "Descansan" ; st.caption(f"{resting_label}: {', '.join(round_data['resting'])}") # Simplificado
-                    if not round_data.get('matches'): st.info("No hay partidos en esta ronda."); continue
-                    for match_idx, match in enumerate(round_data.get('matches', [])):
-                        if 'pair1' not in match or 'pair2' not in match: continue
-                        p1_tuple, p2_tuple = match['pair1'], match['pair2']
-                        if not (isinstance(p1_tuple, (list, tuple)) and len(p1_tuple)==2 and isinstance(p2_tuple, (list, tuple)) and len(p2_tuple)==2): continue
-                        p1_name, p2_name = f"{p1_tuple[0]}/{p1_tuple[1]}", f"{p2_tuple[0]}/{p2_tuple[1]}"
-                        col_match, col_score1, col_score2 = st.columns([3, 1, 1])
-                        with col_match: st.markdown(f"**Pista {match.get('court', '?')}**: {p1_name} **vs** {p2_name}")
-                        match_id = f"r{round_data.get('round_num', '?')}_m{match_idx}"; score1_key, score2_key = f"score1_{match_id}", f"score2_{match_id}"
-                        # --- CORRECCIÓN AQUÍ: Usar .get(key, 0) para valor inicial ---
-                        with col_score1:
-                            st.number_input(f"G {p1_name}", 0, key=score1_key, step=1, format="%d", label_visibility="collapsed", value=st.session_state.get(score1_key, 0)) # Valor por defecto 0
-                        with col_score2:
-                            st.number_input(f"G {p2_name}", 0, key=score2_key, step=1, format="%d", label_visibility="collapsed", value=st.session_state.get(score2_key, 0)) # Valor por defecto 0
-                        # --- FIN CORRECCIÓN ---
-                        st.divider()
-    with tab2:
+            with st.expander("📥 Importar resultados por lotes"):
+                st.caption("CSV o JSON con `round`, `court` (o `match` / `match_id`), `score1`, `score2`. El lote se valida entero y se aplica de una vez.")
+                st.file_uploader("Fichero de resultados", type=["csv", "json"], key='results_upload')
+                col_import, col_sync = st.columns(2)
+                col_import.button("Importar fichero", on_click=on_import_results)
+                col_sync.button("🔄 Sincronizar resultados guardados", on_click=on_sync_results, disabled=not st.session_state.get('tournament_id'), help="Trae los resultados recibidos por el endpoint HTTP (python -m padel_core.ingest_server).")
+                feedback = st.session_state.pop('import_feedback', None)
+                if feedback: getattr(st, feedback[0])(feedback[1])
+            if ledger is not None and not groups: # La replanificación no reparte entre grupos
+                with st.expander("🔁 Altas, bajas y cambio de pistas"): render_replan_panel(is_classification_pairs, ledger)
+            if st.session_state.get('render_all_rounds'):
+                # Modo clásico: todas las rondas en pestañas (solo para comparar tiempos de recarga)
+                round_tabs = st.tabs([f"Ronda {r.get('round_num', '?')}" for r in sorted_rounds])
+                for i, round_data in enumerate(sorted_rounds):
+                    with round_tabs[i], prof.stage("render_round"): render_round(round_data, is_classification_pairs, group_of)
+            else:
+                rounds_by_num = {r.get('round_num'): r for r in sorted_rounds}
+                selected_round = st.selectbox("Ronda", list(rounds_by_num), key='view_round', format_func=lambda n: f"Ronda {n}")
+                with prof.stage("render_round"): render_round(rounds_by_num[selected_round], is_classification_pairs, group_of)
+    elif view == VIEW_STANDINGS:
         st.subheader(f"Tabla de Clasificación ({'Parejas' if is_classification_pairs else 'Individual'})")
         if not standings_data or not sorted_keys: st.info("Aún no hay resultados.")
         else:
-             standings_list = []; entity_label = "Pareja" if is_classification_pairs else "Jugador"
-             for pos, key in enumerate(sorted_keys):
-                 stats = standings_data.get(key, {}); row = {"Pos": pos + 1, entity_label: key}
-                 row.update({'PJ': stats.get('PJ', 0), 'PG': stats.get('PG', 0), 'PE': stats.get('PE', 0), 'PP': stats.get('PP', 0), 'JG': stats.get('JG', 0), 'JR': stats.get('JR', 0), 'DG': stats.get('DG', 0)})
-                 standings_list.append(row)
-             df_standings = pd.DataFrame(standings_list); cols_to_show = ['Pos', entity_label, 'PJ', 'PG', 'PE', 'PP', 'JG', 'JR', 'DG']
-             cols_exist = [col for col in cols_to_show if col in df_standings.columns]; df_display = df_standings[cols_exist]
-             if 'Pos' in df_display.columns: st.dataframe(df_display.set_index('Pos'), use_container_width=True)
-             else: st.dataframe(df_display, use_container_width=True)
-             st.download_button(f"📄 Descargar Clasificación ({entity_label}) (.txt)", generate_standings_text(standings_data, sorted_keys, st.session_state.config.get('name', 'Torneo'), is_classification_pairs), f"clasificacion_{st.session_state.config.get('name', 'torneo').replace(' ', '_')}_{entity_label.lower()}.txt", 'text/plain')
+             entity_label = "Pareja" if is_classification_pairs else "Jugador"
+             # La tabla y el .txt solo se reconstruyen cuando el libro ha cambiado desde la última vez
+             cached = st.session_state.get('standings_view_cache')
+             if cached is None or cached[0] != ledger.version:
+                 with prof.stage("dataframe"): df_display = ledger.model.to_dataframe(entity_label) # Vectorizado desde los arrays del modelo
+                 with prof.stage("standings_text"): standings_txt = generate_standings_text(standings_data, sorted_keys, st.session_state.config.get('name', 'Torneo'), is_classification_pairs)
+                 cached = (ledger.version, df_display, standings_txt)
+                 st.session_state.standings_view_cache = cached
+             if groups:
+                 group_tabs = st.tabs(["General"] + [f"Grupo {group_name(i)}" for i in range(len(groups))])
+                 with group_tabs[0]: st.dataframe(cached[1], use_container_width=True)
+                 for tab, members in zip(group_tabs[1:], group_standings(sorted_keys, groups)):
+                     df_group = cached[1].set_index(entity_label).loc[members].reset_index(); df_group.index = range(1, len(members) + 1); df_group.index.name = 'Pos'
+                     with tab: st.dataframe(df_group, use_container_width=True)
+             else: st.dataframe(cached[1], use_container_width=True)
+             st.download_button(f"📄 Descargar Clasificación ({entity_label}) (.txt)", cached[2], f"clasificacion_{st.session_state.config.get('name', 'torneo').replace(' ', '_')}_{entity_label.lower()}.txt", 'text/plain')
+
+    elif view == VIEW_KNOCKOUT and groups:
+        st.subheader("Eliminatoria")
+        render_knockout(is_classification_pairs)
+    elif ledger is not None:
+        st.subheader("Probabilidades de clasificación (Monte Carlo)")
+        entity_label = "Pareja" if is_classification_pairs else "Jugador"
+        col_sims, col_kind, col_games, col_strength = st.columns(4)
+        n_sims = col_sims.selectbox("Simulaciones", (10_000, 50_000, 100_000, 250_000), index=2, key='sim_n', format_func=lambda n: f"{n:,}".replace(",", "."))
+        kind = col_kind.selectbox("Marcador simulado", tuple(SCORE_KIND_LABELS), key='sim_kind', format_func=SCORE_KIND_LABELS.get)
+        games = col_games.number_input("Juegos (N)", 1, value=6, step=1, key='sim_games')
+        strength = col_strength.selectbox("Fuerza", tuple(STRENGTH_LABELS), key='sim_strength', format_func=STRENGTH_LABELS.get)
+        pending = int((ledger.model.scores[:, 0] < 0).sum()); st.caption(f"{pending} de {len(ledger.model)} partidos pendientes. Desempate: PG, DG, JG.")
+        sim_params = (ledger.version, n_sims, kind, games, strength)
+        if st.button("🎲 Simular partidos pendientes"):
+            with st.spinner("Simulando..."): probabilities = simulate_positions(ledger.model, n_sims, ScoreModel(kind, games, strength))
+            st.session_state.simulation_result = (sim_params, probabilities)
+        sim_result = st.session_state.get('simulation_result')
+        if sim_result and sim_result[0] == sim_params:
+            df_probs = positions_dataframe(ledger.entities, sim_result[1], entity_label, [ledger.entities.index(k) for k in sorted_keys])
+            pct_cols = {c: st.column_config.NumberColumn(format="%.1f %%") for c in df_probs.columns if c.endswith("º")}
+            st.dataframe(df_probs, hide_index=True, use_container_width=True, column_config={"Pos. esperada": st.column_config.NumberColumn(format="%.2f"), **pct_cols})
+        elif sim_result: st.info("Han cambiado los resultados o los parámetros desde la última simulación: vuelve a simular.")
+
+    with st.sidebar:
+        st.checkbox("Mostrar todas las rondas (modo clásico)", key='render_all_rounds', help="Dibuja todas las rondas a la vez, como antes; útil para comparar tiempos de recarga.")
+        timings = st.session_state.get('rerun_timings_ms', {})
+        st.caption(f"⏱️ Recarga completa: {(time.perf_counter() - _rerun_start) * 1000:.0f} ms | Último partido editado: {timings.get('match', 0):.1f} ms")
 
     st.divider()
     if st.button("⚠️ Empezar Nuevo Torneo (Borrar Todo)"):
         keys_to_delete = list(st.session_state.keys());
         for key in keys_to_delete: del st.session_state[key]
-        st.rerun()
\ No newline at end of file
+        st.query_params.clear()
+        st.rerun()
+
+# --- Panel de perfilado (solo con PADEL_PROFILE=1 o ?profile=1) ---
+if prof.enabled:
+    with st.sidebar.expander("📈 Perfil de recargas", expanded=True):
+        profile_rows = prof.summary()
+        if profile_rows: st.dataframe(pd.DataFrame(profile_rows).set_index("métrica"), use_container_width=True, column_config={c: st.column_config.NumberColumn(format="%.2f") for c in ("p50", "p95", "p99", "máx")})
+        else: st.caption("Aún no hay muestras.")
+        if st.button("💾 Volcar muestras a fichero"): st.success(f"Guardado en {prof.dump(os.environ.get(DUMP_PATH_ENV_VAR, DEFAULT_DUMP_PATH))}")
+    prof.end_rerun((time.perf_counter() - _rerun_start) * 1000)
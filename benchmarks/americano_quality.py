@@ -0,0 +1,86 @@
+"""
+Calidad del motor Americano frente al generador original de la app.
+
+Para cada combinación de jugadores y pistas genera el fixture con varias
+semillas con `generate_americano_fixture` y con una copia del generador
+aleatorio que había antes en app.py, y compara la media de compañeros
+repetidos (y de rivales repetidos y desequilibrio de descansos):
+
+    python benchmarks/americano_quality.py
+    python benchmarks/americano_quality.py --players 12 33 --courts 2 8 --seeds 8
+
+Termina con código 1 si el motor repite de media más compañeros que el original
+en algún caso.
+"""
+import argparse
+import random
+import statistics
+import sys
+from itertools import combinations
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from padel_core import fixture_quality, generate_americano_fixture  # noqa: E402
+
+CASES = ((12, 2), (16, 2), (20, 4), (33, 8), (64, 4), (128, 16), (256, 8))
+
+
+def legacy_americano_fixture(players, num_courts, rng):
+    """El generador original de app.py (rotación aleatoria priorizando parejas nuevas), con un `random.Random` propio."""
+    fixture = {"rounds": []}; all_players = list(players); played_pairs_history = set()
+    for _ in range(max(1, len(players) - 1)):
+        round_matches = []; players_this_round = list(all_players); rng.shuffle(players_this_round)
+        max_matches_in_round = min(num_courts, len(players_this_round) // 4)
+        if max_matches_in_round <= 0: continue
+        possible_pairs = list(combinations(players_this_round, 2)); rng.shuffle(possible_pairs)
+        potential_pairs = []; players_already_paired = set()
+        for p1, p2 in possible_pairs:
+            pair_tuple = tuple(sorted((p1, p2))); priority = 1 if pair_tuple not in played_pairs_history else 0
+            if p1 not in players_already_paired and p2 not in players_already_paired: potential_pairs.append((priority, pair_tuple))
+        potential_pairs.sort(key=lambda x: x[0], reverse=True)
+        final_round_pairs = []; players_in_final_pairs = set()
+        for _, pair_tuple in potential_pairs:
+            p1, p2 = pair_tuple
+            if p1 not in players_in_final_pairs and p2 not in players_in_final_pairs: final_round_pairs.append(pair_tuple); players_in_final_pairs.add(p1); players_in_final_pairs.add(p2)
+        match_count = 0; assigned_players_in_match = set(); available_pairs_for_match = list(final_round_pairs); rng.shuffle(available_pairs_for_match)
+        while match_count < max_matches_in_round and len(available_pairs_for_match) >= 2:
+            pair1 = available_pairs_for_match.pop(0)
+            for i in range(len(available_pairs_for_match)):
+                pair2 = available_pairs_for_match[i]
+                if not set(pair1) & set(pair2):
+                    available_pairs_for_match.pop(i); played_pairs_history.add(tuple(sorted(pair1))); played_pairs_history.add(tuple(sorted(pair2)))
+                    round_matches.append({"court": match_count + 1, "pair1": pair1, "pair2": pair2, "score1": None, "score2": None})
+                    assigned_players_in_match.update(pair1); assigned_players_in_match.update(pair2); match_count += 1; break
+        if round_matches: fixture["rounds"].append({"round_num": len(fixture["rounds"]) + 1, "matches": round_matches,
+                                                    "resting": [p for p in all_players if p not in assigned_players_in_match]})
+    return fixture
+
+
+def compare_quality(cases, seeds):
+    """Imprime la media por caso y devuelve los casos en que el motor repite más compañeros que el original."""
+    worse = []
+    for num_players, num_courts in cases:
+        players = [f"J{i + 1}" for i in range(num_players)]; new = []; old = []
+        for seed in range(seeds):
+            new.append(fixture_quality(generate_americano_fixture(players, num_courts, seed=seed), players))
+            old.append(fixture_quality(legacy_americano_fixture(players, num_courts, random.Random(seed)), players))
+        means = {k: (statistics.mean(q[k] for q in new), statistics.mean(q[k] for q in old)) for k in new[0]}
+        print(f"jugadores={num_players:<4} pistas={num_courts:<3} " + "  ".join(f"{k}: {n:.1f} (original {o:.1f})" for k, (n, o) in means.items()))
+        if means["repeated_partners"][0] > means["repeated_partners"][1]: worse.append((num_players, num_courts))
+    return worse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara la calidad del motor Americano con el generador original.")
+    parser.add_argument("--players", type=int, nargs="+"); parser.add_argument("--courts", type=int, nargs="+")
+    parser.add_argument("--seeds", type=int, default=8)
+    args = parser.parse_args(argv)
+    cases = [(p, c) for p in args.players for c in args.courts] if args.players and args.courts else CASES
+    worse = compare_quality(cases, args.seeds)
+    if worse: print("PEOR que el original en compañeros repetidos: " + ", ".join(f"{p}j/{c}p" for p, c in worse))
+    return 1 if worse else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+Benchmarks de la lógica de torneos (sin navegador ni Streamlit).
+
+Mide generación de fixtures, clasificaciones (completa y vectorizada) sobre fixtures con todos los
+marcadores y exportación a texto sobre una rejilla de jugadores y pistas, y
+guarda tiempo, pico de memoria y calidad del fixture en JSON:
+
+    python benchmarks/bench_core.py run --output base.json
+    python benchmarks/bench_core.py run --quick --output nuevo.json
+    python benchmarks/bench_core.py compare base.json nuevo.json --threshold 0.15
+
+Además reparte en turnos fixtures Americano de rondas completas con jugadores
+que no son múltiplo de 4 y pistas que no dividen la ronda (FULL_ROUND_CASES) y
+guarda los turnos usados junto al mínimo teórico.
+
+`compare` termina con código 1 si algún caso es más lento que el umbral
+relativo, si empeora la calidad del fixture o si usa más turnos.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from padel_core import (ResultsModel, StandingsLedger, calculate_standings_americano, calculate_standings_pairs, fixture_quality,  # noqa: E402
+                        generate_americano_fixture, generate_round_robin_pairs_fixture, generate_standings_text)
+
+PLAYERS_GRID = (8, 16, 32, 64, 128, 256, 512)
+COURTS_GRID = (1, 2, 4, 8, 16, 32)
+QUICK_PLAYERS_GRID = (8, 32, 128)
+QUICK_COURTS_GRID = (2, 8)
+QUALITY_KEYS = ("repeated_partners", "repeated_opponents", "rest_imbalance")
+# (jugadores, pistas) de Americano con rondas completas repartidas en turnos
+FULL_ROUND_CASES = ((30, 7), (50, 12), (102, 25), (255, 64))
+
+
+def _measure(func, repeat):
+    """Ejecuta `func` `repeat` veces; devuelve (resultado, mediana ms, mínimo ms, pico de memoria KiB)."""
+    times = []; result = None
+    for _ in range(repeat):
+        start = time.perf_counter(); result = func(); times.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start(); func(); peak = tracemalloc.get_traced_memory()[1]; tracemalloc.stop()
+    return result, statistics.median(times), min(times), peak / 1024
+
+
+def _scored(fixture, rng):
+    """Marcadores aleatorios para todos los partidos, con las claves que usaría st.session_state."""
+    scores = {}
+    for round_data in fixture["rounds"]:
+        for match_idx in range(len(round_data["matches"])):
+            match_id = f"r{round_data['round_num']}_m{match_idx}"
+            scores[f"score1_{match_id}"] = rng.randint(0, 7); scores[f"score2_{match_id}"] = rng.randint(0, 7)
+    return scores
+
+
+def _record(results, bench, players, courts, timing, **extra):
+    _, median_ms, min_ms, peak_kib = timing
+    results.append({"bench": bench, "players": players, "courts": courts, "wall_ms": round(median_ms, 3), "min_ms": round(min_ms, 3), "peak_kib": round(peak_kib, 1), **extra})
+    print(f"{bench:<22} jugadores={players:<4} pistas={courts if courts is not None else '-':<3} {median_ms:9.2f} ms  pico={peak_kib:9.1f} KiB", file=sys.stderr)
+
+
+def run_suite(players_grid, courts_grid, repeat, seed):
+    rng = random.Random(seed); results = []
+    for num_players in players_grid:
+        players = [f"Jugador {i + 1}" for i in range(num_players)]
+        pairs = [(players[i], players[i + 1]) for i in range(0, num_players - 1, 2)]
+        for num_courts in courts_grid:
+            timing = _measure(lambda: generate_americano_fixture(players, num_courts, seed=seed), repeat); fixture = timing[0]
+            _record(results, "americano_fixture", num_players, num_courts, timing, matches=sum(len(r["matches"]) for r in fixture["rounds"]), quality=fixture_quality(fixture, players))
+            scores = _scored(fixture, rng)
+            _record(results, "standings_americano", num_players, num_courts, _measure(lambda: calculate_standings_americano(players, fixture, scores), repeat))
+            model = StandingsLedger.from_scores(players, fixture, scores).model
+            _record(results, "standings_columnar", num_players, num_courts, _measure(lambda: ResultsModel.ranking(model.compute()), repeat))
+
+            timing = _measure(lambda: generate_round_robin_pairs_fixture(pairs, num_courts), repeat); rr_fixture = timing[0]
+            _record(results, "round_robin_fixture", num_players, num_courts, timing, matches=sum(len(r["matches"]) for r in rr_fixture["rounds"]), quality=fixture_quality(rr_fixture, players))
+            rr_scores = _scored(rr_fixture, rng)
+            _record(results, "standings_pairs", num_players, num_courts, _measure(lambda: calculate_standings_pairs(pairs, rr_fixture, rr_scores), repeat))
+        standings, sorted_keys = calculate_standings_americano(players, fixture, scores)
+        _record(results, "standings_text", num_players, None, _measure(lambda: generate_standings_text(standings, sorted_keys, "Benchmark"), repeat))
+    for num_players, num_courts in FULL_ROUND_CASES:
+        players = [f"Jugador {i + 1}" for i in range(num_players)]
+        timing = _measure(lambda: generate_americano_fixture(players, num_courts, seed=seed, full_rounds=True), repeat); schedule = timing[0]["schedule"]
+        _record(results, "americano_full_rounds", num_players, num_courts, timing, matches=schedule["matches"], slots=schedule["slots"], lower_bound=schedule["lower_bound"])
+    return results
+
+
+def compare(base_path, new_path, threshold, min_delta_ms=0.5):
+    """Compara dos ejecuciones caso a caso (ignorando diferencias menores de `min_delta_ms`). Devuelve el nº de regresiones."""
+    def load(path):
+        with open(path, encoding="utf-8") as fh: data = json.load(fh)
+        return {(r["bench"], r["players"], r["courts"]): r for r in data["results"]}
+    base, new = load(base_path), load(new_path); regressions = 0
+    print(f"{'caso':<40} {'base ms':>10} {'nuevo ms':>10} {'cambio':>8}")
+    for key in sorted(set(base) & set(new), key=lambda k: (k[0], k[1], k[2] or 0)):
+        b, n = base[key], new[key]; change = (n["wall_ms"] - b["wall_ms"]) / b["wall_ms"] if b["wall_ms"] else 0.0
+        flags = []
+        if change > threshold and n["wall_ms"] - b["wall_ms"] > min_delta_ms: flags.append("MÁS LENTO")
+        worse_quality = [k for k in QUALITY_KEYS if "quality" in b and n.get("quality", {}).get(k, 0) > b["quality"].get(k, 0)]
+        if worse_quality: flags.append("CALIDAD PEOR: " + ", ".join(worse_quality))
+        if "slots" in b and n.get("slots", 0) > b["slots"]: flags.append(f"MÁS TURNOS: {b['slots']} -> {n['slots']} (mínimo {n.get('lower_bound', '?')})")
+        regressions += bool(flags)
+        label = f"{key[0]} j={key[1]} p={key[2] if key[2] is not None else '-'}"
+        print(f"{label:<40} {b['wall_ms']:>10.2f} {n['wall_ms']:>10.2f} {change:>+8.1%} {' | '.join(flags)}")
+    missing = set(base) - set(new)
+    if missing: print(f"{len(missing)} casos de la base no están en la nueva ejecución")
+    print(f"{regressions} regresiones (umbral {threshold:.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de fixtures, clasificaciones y exportación.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_p = sub.add_parser("run", help="Ejecuta la rejilla de benchmarks")
+    run_p.add_argument("--output", default="bench_results.json")
+    run_p.add_argument("--players", type=int, nargs="+", help=f"Nº de jugadores (por defecto {PLAYERS_GRID})")
+    run_p.add_argument("--courts", type=int, nargs="+", help=f"Nº de pistas (por defecto {COURTS_GRID})")
+    run_p.add_argument("--quick", action="store_true", help="Rejilla reducida para comprobaciones rápidas")
+    run_p.add_argument("--repeat", type=int, default=3)
+    run_p.add_argument("--seed", type=int, default=1)
+    cmp_p = sub.add_parser("compare", help="Compara dos ejecuciones")
+    cmp_p.add_argument("base"); cmp_p.add_argument("new")
+    cmp_p.add_argument("--threshold", type=float, default=0.15, help="Empeoramiento relativo tolerado (0.15 = 15%%)")
+    cmp_p.add_argument("--min-delta-ms", type=float, default=0.5, help="Diferencia absoluta mínima para contar como regresión")
+    args = parser.parse_args(argv)
+
+    if args.command == "compare": return 1 if compare(args.base, args.new, args.threshold, args.min_delta_ms) else 0
+    players_grid = args.players or (QUICK_PLAYERS_GRID if args.quick else PLAYERS_GRID)
+    courts_grid = args.courts or (QUICK_COURTS_GRID if args.quick else COURTS_GRID)
+    results = run_suite(players_grid, courts_grid, args.repeat, args.seed)
+    meta = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(), "platform": platform.platform(), "repeat": args.repeat, "seed": args.seed}
+    Path(args.output).write_text(json.dumps({"meta": meta, "results": results}, indent=1), encoding="utf-8")
+    print(f"Resultados en {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+Mide la latencia de recarga de la vista de resultados con AppTest (sin navegador).
+
+Compara el modo clásico (todas las rondas dibujadas a la vez) con el modo
+paginado por ronda con un fragmento por partido:
+
+    python benchmarks/rerun_latency.py --players 24 --courts 6 --edits 20
+
+AppTest siempre ejecuta el script completo, así que "recarga completa" es el
+coste de una edición sin fragmentos; "fragmento" es el tiempo del cuerpo de
+`render_match`, que es lo único que se vuelve a ejecutar en el navegador al
+editar un marcador en modo paginado. Los torneos se guardan en una base de
+datos temporal (PADEL_DB_PATH), no en la de la aplicación.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / "app.py")
+
+
+def _start_tournament(num_players, num_courts):
+    at = AppTest.from_file(APP_PATH, default_timeout=120); at.run()
+    at.number_input[0].set_value(num_players); at.number_input[1].set_value(num_courts); at.button[0].click().run()
+    at.button[0].click().run()
+    next(b for b in at.button if "Americano" in b.label).click().run()
+    return at
+
+
+def measure(num_players, num_courts, edits, render_all):
+    at = _start_tournament(num_players, num_courts)
+    if render_all: at.sidebar.checkbox(key='render_all_rounds').check().run()
+    widgets = len(at.number_input); samples = []
+    for i in range(edits):
+        widget = at.number_input[i % len(at.number_input)]
+        start = time.perf_counter(); widget.set_value(i % 7 + 1).run(); samples.append((time.perf_counter() - start) * 1000)
+    fragment_ms = at.session_state['rerun_timings_ms'].get('match', 0.0) if 'rerun_timings_ms' in at.session_state else 0.0
+    return {"widgets": widgets, "median_ms": statistics.median(samples), "max_ms": max(samples), "fragment_ms": fragment_ms}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--players", type=int, default=24)
+    parser.add_argument("--courts", type=int, default=6)
+    parser.add_argument("--edits", type=int, default=20)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory(prefix="padel-bench-") as tmp:
+        os.environ["PADEL_DB_PATH"] = os.path.join(tmp, "torneos.db")
+        for label, render_all in (("Clásico (todas las rondas)", True), ("Paginado + fragmentos", False)):
+            r = measure(args.players, args.courts, args.edits, render_all)
+            print(f"{label:<28} widgets={r['widgets']:<5} recarga completa mediana={r['median_ms']:.1f} ms (máx {r['max_ms']:.1f}) | fragmento={r['fragment_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
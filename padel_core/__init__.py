@@ -0,0 +1,34 @@
+"""
+Lógica de torneos de pádel independiente de la interfaz Streamlit.
+
+Ningún módulo de este paquete importa Streamlit ni pandas al cargarse (solo
+NumPy), de modo que puede usarse desde la CLI (`python -m padel_core`), scripts
+o pruebas.
+"""
+from .americano import AmericanoScheduler, build_americano_fixture, fixture_quality
+from .columnar import ResultsModel
+from .export import generate_standings_text
+from .fixtures import (FixtureError, frozen_round_count, generate_americano_fixture, generate_round_robin_pairs_fixture, replan_americano_fixture,
+                       replan_round_robin_pairs_fixture)
+from .groups import (bracket_score, generate_group_fixture, group_name, group_qualifiers, group_standings, knockout_bracket, playoff_pairs, resolve_bracket,
+                     seed_groups)
+from .ingest import IngestError, parse_results, resolve_results
+from .ledger import MAX_SCORE, STAT_KEYS, StandingsLedger, match_sides
+from .scheduling import pack_matches, projected_duration, slot_lower_bound
+from .standings import calculate_standings_americano, calculate_standings_pairs
+from .store import StoreError, TournamentStore, parse_match_id
+
+__all__ = [
+    "AmericanoScheduler", "build_americano_fixture", "fixture_quality",
+    "ResultsModel",
+    "generate_standings_text",
+    "FixtureError", "generate_americano_fixture", "generate_round_robin_pairs_fixture",
+    "frozen_round_count", "replan_americano_fixture", "replan_round_robin_pairs_fixture",
+    "bracket_score", "generate_group_fixture", "group_name", "group_qualifiers", "group_standings", "knockout_bracket", "playoff_pairs", "resolve_bracket",
+    "seed_groups",
+    "IngestError", "parse_results", "resolve_results",
+    "MAX_SCORE", "STAT_KEYS", "StandingsLedger", "match_sides",
+    "pack_matches", "projected_duration", "slot_lower_bound",
+    "calculate_standings_americano", "calculate_standings_pairs",
+    "StoreError", "TournamentStore", "parse_match_id",
+]
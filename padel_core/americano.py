@@ -0,0 +1,188 @@
+"""
+Motor de emparejamientos para torneos Americano (parejas rotativas).
+
+Lleva la cuenta incremental de compañeros, rivales y descansos de cada jugador
+y construye cada ronda a partir de la rotación del método del círculo: con
+pistas suficientes, cada jugador estrena compañero en todas las rondas. Cuando
+hay descansos, los jugadores que se quedan sin compañero se reemparejan
+priorizando a quien menos veces han compartido pista, y una pasada de
+intercambios entre parejas deshace los compañeros repetidos que queden.
+"""
+import random
+
+from .scheduling import pack_matches, schedule_info, slot_rounds
+
+# Nº máximo de parejas candidatas que se evalúan al buscar rival (acota el coste por ronda).
+OPPONENT_SEARCH_WINDOW = 16
+# Pasadas máximas de intercambios para deshacer compañeros repetidos en una ronda.
+REPAIR_PASSES = 4
+
+
+class AmericanoScheduler:
+    """Genera rondas Americano una a una manteniendo el historial de cada jugador."""
+
+    def __init__(self, players, num_courts, seed=None):
+        self.players = list(players)
+        self.num_courts = num_courts
+        self._index = {p: i for i, p in enumerate(self.players)}
+        self._rng = random.Random(seed)
+        n = len(self.players)
+        self.partner_counts = [[0] * n for _ in range(n)]
+        self.opponent_counts = [[0] * n for _ in range(n)]
+        self.rest_counts = [0] * n
+        self.rounds_played = 0
+        # Disposición del círculo (None hace de BYE con un nº impar de jugadores)
+        self._circle = list(range(n)); self._rng.shuffle(self._circle)
+        if n % 2: self._circle.append(None)
+
+    def _circle_pairs(self, round_idx):
+        """Parejas de la ronda `round_idx` según el método del círculo (un 1-factor del grupo)."""
+        circle = self._circle; m = len(circle)
+        if m < 2: return []
+        shift = round_idx % (m - 1); rest = circle[1:]
+        rotated = [circle[0]] + rest[-shift:] + rest[:-shift] if shift else list(circle)
+        return [(rotated[i], rotated[m - 1 - i]) for i in range(m // 2)]
+
+    def _choose_resting(self, num_resting):
+        """Descansan los que menos han descansado hasta ahora (empates al azar)."""
+        if num_resting <= 0: return set()
+        rng = self._rng; rests = self.rest_counts
+        order = sorted(range(len(self.players)), key=lambda i: (rests[i], rng.random()))
+        return set(order[:num_resting])
+
+    def _pair_players(self, playing):
+        """Forma las parejas de la ronda partiendo del círculo y reemparejando a los huérfanos."""
+        partners = self.partner_counts; pairs = []; orphans = []
+        for a, b in self._circle_pairs(self.rounds_played):
+            a_plays = a is not None and a in playing; b_plays = b is not None and b in playing
+            if a_plays and b_plays and partners[a][b] == 0: pairs.append((a, b))
+            else:
+                if a_plays: orphans.append(a)
+                if b_plays: orphans.append(b)
+        self._rng.shuffle(orphans)
+        while len(orphans) >= 2:
+            a = orphans.pop(); row = partners[a]
+            best = min(range(len(orphans)), key=lambda k: row[orphans[k]])
+            orphans[best], orphans[-1] = orphans[-1], orphans[best]
+            pairs.append((a, orphans.pop()))
+        return self._repair_pairs(pairs)
+
+    def _repair_pairs(self, pairs):
+        """
+        Deshace compañeros repetidos intercambiando miembros entre dos parejas de la
+        ronda cuando el intercambio reduce las repeticiones (los últimos huérfanos
+        del reparto voraz quedan emparejados sin elección).
+        """
+        partners = self.partner_counts
+        for _ in range(REPAIR_PASSES):
+            improved = False
+            for i in range(len(pairs)):
+                a, b = pairs[i]; cost_ab = partners[a][b]
+                if cost_ab == 0: continue
+                for j in range(len(pairs)):
+                    if j == i: continue
+                    c, d = pairs[j]; current = cost_ab + partners[c][d]
+                    if partners[a][c] + partners[b][d] < current: pairs[i], pairs[j] = (a, c), (b, d)
+                    elif partners[a][d] + partners[b][c] < current: pairs[i], pairs[j] = (a, d), (b, c)
+                    else: continue
+                    improved = True; break
+            if not improved: break
+        return pairs
+
+    def _match_pairs(self, pairs):
+        """Cruza las parejas buscando rivales con el menor nº de enfrentamientos previos."""
+        opp = self.opponent_counts; pool = list(pairs); self._rng.shuffle(pool); matches = []
+        while len(pool) >= 2:
+            a1, a2 = pool.pop(); row1, row2 = opp[a1], opp[a2]
+            best_k, best_cost = None, None
+            for k in range(len(pool) - 1, max(-1, len(pool) - 1 - OPPONENT_SEARCH_WINDOW), -1):
+                b1, b2 = pool[k]; cost = row1[b1] + row1[b2] + row2[b1] + row2[b2]
+                if best_cost is None or cost < best_cost:
+                    best_k, best_cost = k, cost
+                    if cost == 0: break
+            pool[best_k], pool[-1] = pool[-1], pool[best_k]
+            matches.append(((a1, a2), pool.pop()))
+        return matches
+
+    def next_round(self):
+        """Genera (y registra) la siguiente ronda. Devuelve None si no caben partidos."""
+        n = len(self.players); num_matches = min(self.num_courts, n // 4)
+        if num_matches <= 0: return None
+        resting = self._choose_resting(n - 4 * num_matches)
+        playing = set(range(n)) - resting
+        matches = self._match_pairs(self._pair_players(playing))
+        names = self.players
+        round_data = {"round_num": self.rounds_played + 1, "matches": [], "resting": [names[i] for i in range(n) if i in resting]}
+        for court_idx, (pair1, pair2) in enumerate(matches):
+            round_data["matches"].append({"court": court_idx + 1, "pair1": tuple(sorted((names[pair1[0]], names[pair1[1]]))),
+                                          "pair2": tuple(sorted((names[pair2[0]], names[pair2[1]]))), "score1": None, "score2": None})
+        self.record_round(round_data)
+        return round_data
+
+    def record_round(self, round_data):
+        """Actualiza los contadores con una ronda ya jugada o generada."""
+        idx = self._index; partners = self.partner_counts; opp = self.opponent_counts; playing = set()
+        for match in round_data.get("matches", []):
+            side1 = [idx[p] for p in match["pair1"] if p in idx]; side2 = [idx[p] for p in match["pair2"] if p in idx]
+            for side in (side1, side2):
+                if len(side) == 2: partners[side[0]][side[1]] += 1; partners[side[1]][side[0]] += 1
+            for a in side1:
+                for b in side2: opp[a][b] += 1; opp[b][a] += 1
+            playing.update(side1); playing.update(side2)
+        for i in range(len(self.players)):
+            if i not in playing: self.rest_counts[i] += 1
+        self.rounds_played += 1
+
+    def quality(self):
+        """Indicadores de calidad del fixture generado hasta ahora."""
+        n = len(self.players)
+        rep_partners = sum(max(0, self.partner_counts[i][j] - 1) for i in range(n) for j in range(i + 1, n))
+        rep_opponents = sum(max(0, self.opponent_counts[i][j] - 1) for i in range(n) for j in range(i + 1, n))
+        rest_imbalance = (max(self.rest_counts) - min(self.rest_counts)) if n else 0
+        return {"repeated_partners": rep_partners, "repeated_opponents": rep_opponents, "rest_imbalance": rest_imbalance}
+
+
+def build_americano_fixture(players, num_courts, num_rounds=None, seed=None, full_rounds=False):
+    """
+    Genera un fixture Americano completo con `AmericanoScheduler`.
+    Por defecto juega N-1 rondas (N = nº jugadores) de como mucho `num_courts`
+    partidos y añade su informe de calidad. Con `full_rounds` las rondas de la
+    rotación no se limitan a las pistas (juegan todos los que caben en grupos de 4)
+    y sus partidos se reparten después en turnos de `num_courts` pistas.
+    """
+    if len(players) < 4: raise ValueError("Min 4 jugadores para Americano.")
+    scheduler = AmericanoScheduler(players, len(players) // 4 if full_rounds else num_courts, seed=seed)
+    fixture = {"rounds": []}
+    for _ in range(num_rounds if num_rounds is not None else max(1, len(players) - 1)):
+        round_data = scheduler.next_round()
+        if round_data is None: break
+        fixture["rounds"].append(round_data)
+    matches = [match for round_data in fixture["rounds"] for match in round_data["matches"]]
+    if full_rounds:
+        fixture["rounds"] = slot_rounds(pack_matches(matches, num_courts), players)
+        fixture["quality"] = fixture_quality(fixture, players)
+    else: fixture["quality"] = scheduler.quality()
+    fixture["schedule"] = schedule_info(matches, num_courts, len(fixture["rounds"]))
+    return fixture
+
+
+def fixture_quality(fixture, players):
+    """
+    Calcula los mismos indicadores que `AmericanoScheduler.quality` para cualquier fixture
+    (p. ej. uno Round Robin o uno cargado de disco), contando por jugador.
+    """
+    partner_counts = {}; opponent_counts = {}; played = {p: 0 for p in players}; rounds = fixture.get("rounds", []) if fixture else []
+    for round_data in rounds:
+        for match in round_data.get("matches", []):
+            pair1, pair2 = tuple(match["pair1"]), tuple(match["pair2"])
+            for pair in (pair1, pair2):
+                key = tuple(sorted(pair)); partner_counts[key] = partner_counts.get(key, 0) + 1
+            for a in pair1:
+                for b in pair2:
+                    key = (a, b) if a < b else (b, a); opponent_counts[key] = opponent_counts.get(key, 0) + 1
+            for p in pair1 + pair2:
+                if p in played: played[p] += 1
+    rests = [len(rounds) - c for c in played.values()]
+    return {"repeated_partners": sum(c - 1 for c in partner_counts.values() if c > 1),
+            "repeated_opponents": sum(c - 1 for c in opponent_counts.values() if c > 1),
+            "rest_imbalance": (max(rests) - min(rests)) if rests else 0}
@@ -0,0 +1,160 @@
+"""
+CLI por lotes: genera fixtures y clasificaciones de muchos torneos en un solo proceso.
+
+    python -m padel_core torneos.json otros.csv --out-dir salida/
+
+Entrada JSON: un objeto o una lista de objetos con
+    {"name": "Torneo", "format": "americano" | "parejas", "num_courts": 2,
+     "players": ["Ana", ...], "pairs": [["Ana", "Bea"], ...],   # "pairs" opcional
+     "seed": 7, "scores": {"r1_m0": [6, 3], ...},               # opcionales
+     "full_rounds": false, "match_minutes": 20, "groups": 1}     # opcionales
+Con formato "parejas" y sin "pairs", las parejas se sortean entre "players".
+Con "full_rounds" (Americano) todas las rondas son completas y se reparten en
+turnos de pista; con "match_minutes" se añade la duración prevista. Con
+"groups" > 1 se juega una fase de grupos (cabezas de serie por orden de alta)
+en las mismas pistas y el fixture incluye los grupos.
+
+Entrada CSV: una fila por jugador con columnas `tournament,num_courts,player`
+y, opcionalmente, `pair` (identificador de pareja; si aparece, el torneo es de
+parejas fijas) y `format`.
+
+Por cada torneo se escribe `<nombre>.json` (fixture + clasificación) y
+`<nombre>.txt` (clasificación en texto). Sin `--out-dir` se emite una línea
+JSON por torneo en la salida estándar.
+"""
+import argparse
+import csv
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+from .export import generate_standings_text
+from .fixtures import FixtureError, generate_americano_fixture, generate_round_robin_pairs_fixture
+from .groups import generate_group_fixture
+from .scheduling import projected_duration
+from .standings import calculate_standings_americano, calculate_standings_pairs
+
+FORMAT_AMERICANO = "americano"
+FORMAT_PAREJAS = "parejas"
+
+
+def load_specs(path):
+    """Lee las especificaciones de torneo de un fichero JSON o CSV. Lanza OSError/ValueError/csv.Error si no se puede leer."""
+    path = Path(path)
+    if path.suffix.lower() == ".csv": return _load_csv_specs(path)
+    with path.open(encoding="utf-8") as fh: data = json.load(fh)
+    specs = data if isinstance(data, list) else [data]
+    if not all(isinstance(spec, dict) for spec in specs): raise ValueError("Cada torneo debe ser un objeto JSON.")
+    return specs
+
+
+def _load_csv_specs(path):
+    specs = {}; pair_members = {}
+    with path.open(encoding="utf-8", newline="") as fh:
+        for row in csv.DictReader(fh):
+            name = (row.get("tournament") or "").strip() or path.stem
+            spec = specs.setdefault(name, {"name": name, "format": FORMAT_AMERICANO, "num_courts": 1, "players": []})
+            if (row.get("num_courts") or "").strip(): spec["num_courts"] = int(row["num_courts"])
+            if (row.get("format") or "").strip(): spec["format"] = row["format"].strip().lower()
+            player = (row.get("player") or "").strip()
+            if not player: continue
+            spec["players"].append(player)
+            pair_id = (row.get("pair") or "").strip()
+            if pair_id: spec["format"] = FORMAT_PAREJAS; pair_members.setdefault(name, {}).setdefault(pair_id, []).append(player)
+    for name, members in pair_members.items(): specs[name]["pairs"] = list(members.values())
+    return list(specs.values())
+
+
+def _int_field(spec, key, default):
+    value = spec.get(key, default)
+    if value is None or isinstance(value, bool): raise ValueError(f"'{key}' debe ser un número entero.")
+    try: return int(value)
+    except (TypeError, ValueError): raise ValueError(f"'{key}' debe ser un número entero, no {value!r}.") from None
+
+
+def _check_spec(spec):
+    """Comprueba los tipos de los campos de una especificación antes de usarlos; lanza ValueError con el campo que falla."""
+    for key in ("name", "format"):
+        if not isinstance(spec.get(key, ""), str): raise ValueError(f"'{key}' debe ser un texto.")
+    players = spec.get("players", [])
+    if not isinstance(players, list) or not all(p is None or isinstance(p, str) for p in players): raise ValueError("'players' debe ser una lista de nombres.")
+    pairs = spec.get("pairs") or []
+    if not isinstance(pairs, list) or not all(isinstance(p, (list, tuple)) and all(isinstance(n, str) for n in p) for p in pairs):
+        raise ValueError("'pairs' debe ser una lista de parejas de nombres.")
+    scores = spec.get("scores") or {}
+    if not isinstance(scores, dict): raise ValueError("'scores' debe ser un objeto {match_id: [s1, s2]}.")
+    for match_id, score in scores.items():
+        if not isinstance(score, (list, tuple)) or len(score) != 2 or not all(v is None or (isinstance(v, int) and not isinstance(v, bool)) for v in score):
+            raise ValueError(f"El marcador de {match_id} debe ser [s1, s2] con dos enteros (o null).")
+    if spec.get("seed") is not None: _int_field(spec, "seed", None)
+    if spec.get("match_minutes") is not None and (isinstance(spec["match_minutes"], bool) or not isinstance(spec["match_minutes"], (int, float))):
+        raise ValueError("'match_minutes' debe ser un número.")
+
+
+def run_tournament(spec):
+    """Genera el fixture y la clasificación de una especificación. Lanza FixtureError/ValueError si no es válida."""
+    _check_spec(spec)
+    name = spec.get("name", "Torneo"); fmt = spec.get("format", FORMAT_AMERICANO)
+    players = [p.strip() for p in spec.get("players", []) if p and p.strip()]; num_courts = _int_field(spec, "num_courts", 1); num_groups = _int_field(spec, "groups", 1)
+    if len(set(players)) != len(players): raise ValueError("Nombres duplicados.")
+    scores = {}
+    for match_id, (s1, s2) in (spec.get("scores") or {}).items(): scores[f"score1_{match_id}"] = s1; scores[f"score2_{match_id}"] = s2
+    if fmt == FORMAT_PAREJAS:
+        pairs = [tuple(sorted(p)) for p in spec.get("pairs") or []]
+        if not pairs:
+            if len(players) % 2 != 0: raise ValueError(f"Nº par requerido ({len(players)}) para Parejas Fijas.")
+            pl = list(players); random.Random(spec.get("seed")).shuffle(pl); pairs = [tuple(sorted((pl[i], pl[i+1]))) for i in range(0, len(pl), 2)]
+        if any(len(p) != 2 for p in pairs): raise ValueError("Cada pareja debe tener exactamente 2 jugadores.")
+        fixture = generate_round_robin_pairs_fixture(pairs, num_courts) if num_groups <= 1 else generate_group_fixture(pairs, num_groups, num_courts, is_pairs=True, seed=spec.get("seed"))
+        standings, sorted_keys = calculate_standings_pairs(pairs, fixture, scores)
+    elif fmt == FORMAT_AMERICANO:
+        pairs = []
+        if num_groups > 1: fixture = generate_group_fixture(players, num_groups, num_courts, seed=spec.get("seed"))
+        else: fixture = generate_americano_fixture(players, num_courts, seed=spec.get("seed"), full_rounds=bool(spec.get("full_rounds")))
+        standings, sorted_keys = calculate_standings_americano(players, fixture, scores)
+    else: raise ValueError(f"Formato desconocido: {fmt}")
+    is_pairs = fmt == FORMAT_PAREJAS
+    if spec.get("match_minutes"): fixture["schedule"]["duration_minutes"] = projected_duration(fixture["schedule"]["slots"], float(spec["match_minutes"]))
+    return {"name": name, "format": fmt, "num_courts": num_courts, "players": players, "pairs": pairs, "fixture": fixture,
+            "standings": [dict(standings[key], Pos=pos + 1, **{"Pareja" if is_pairs else "Jugador": key}) for pos, key in enumerate(sorted_keys)],
+            "standings_text": generate_standings_text(standings, sorted_keys, name, is_pairs)}
+
+
+def _slug(name):
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "torneo"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m padel_core", description="Genera fixtures y clasificaciones de torneos por lotes.")
+    parser.add_argument("inputs", nargs="+", help="Ficheros .json o .csv con torneos")
+    parser.add_argument("--out-dir", help="Directorio de salida (por defecto, JSON por línea en stdout)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter(); done = 0; failed = 0
+    out_dir = Path(args.out_dir) if args.out_dir else None
+    if out_dir: out_dir.mkdir(parents=True, exist_ok=True)
+    for input_path in args.inputs:
+        # Un fichero ilegible cuenta como error y el lote sigue con los demás
+        try: specs = load_specs(input_path)
+        except (OSError, ValueError, csv.Error) as exc:
+            failed += 1; print(f"[{input_path}] no se pudo leer: {exc}", file=sys.stderr); continue
+        for spec in specs:
+            try: result = run_tournament(spec)
+            except (FixtureError, ValueError) as exc:
+                failed += 1; print(f"[{input_path}] {spec.get('name', '?')}: {exc}", file=sys.stderr); continue
+            done += 1
+            if out_dir:
+                slug = _slug(result["name"])
+                (out_dir / f"{slug}.txt").write_text(result.pop("standings_text"), encoding="utf-8")
+                (out_dir / f"{slug}.json").write_text(json.dumps(result, ensure_ascii=False, indent=1), encoding="utf-8")
+            else:
+                result.pop("standings_text"); print(json.dumps(result, ensure_ascii=False))
+    print(f"{done} torneos procesados, {failed} con errores, en {time.perf_counter() - start:.2f} s", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
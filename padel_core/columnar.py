@@ -0,0 +1,102 @@
+"""
+Modelo de resultados en columnas (NumPy).
+
+Jugadores o parejas se numeran una sola vez y el fixture se guarda como una
+matriz de enteros partido × lado × jugador (`sides`), con los marcadores en
+otra matriz partido × lado (`scores`, -1 = sin resultado). PJ/PG/PE/PP/JG/JR/DG
+se calculan con operaciones vectorizadas, sin recorrer partidos en Python.
+
+pandas solo se importa al pedir un DataFrame (`to_dataframe`).
+"""
+import numpy as np
+
+from .ledger import STAT_KEYS, match_sides
+
+NO_SCORE = -1
+
+
+class ResultsModel:
+    """Fixture y marcadores como arrays de enteros, con clasificación vectorizada."""
+
+    def __init__(self, entities, fixture_data, is_pairs=False):
+        self.entities = list(entities); self.is_pairs = is_pairs
+        index = {e: i for i, e in enumerate(self.entities)}
+        match_ids = []; rows = []
+        for round_data in (fixture_data or {}).get('rounds', []):
+            for match_idx, match in enumerate(round_data.get('matches', [])):
+                sides = match_sides(match, is_pairs)
+                # Igual que calculate_standings_*: se ignoran partidos con entidades desconocidas
+                if sides is None or not all(e in index for e in sides[0] + sides[1]): continue
+                match_ids.append(f"r{round_data.get('round_num', '?')}_m{match_idx}")
+                rows.append([[index[e] for e in sides[0]], [index[e] for e in sides[1]]])
+        width = 1 if is_pairs else 2
+        self.match_ids = match_ids
+        self._row = {match_id: i for i, match_id in enumerate(match_ids)}
+        self.sides = np.array(rows, dtype=np.int32).reshape(len(rows), 2, width)
+        self.scores = np.full((len(rows), 2), NO_SCORE, dtype=np.int64)
+        self.version = 0
+
+    def __len__(self):
+        return len(self.match_ids)
+
+    def has_match(self, match_id):
+        return match_id in self._row
+
+    def set_score(self, match_id, s1, s2):
+        """Guarda (o borra, con None) el marcador de un partido. Devuelve True si ha cambiado."""
+        row = self._row.get(match_id)
+        if row is None: return False
+        new = (NO_SCORE, NO_SCORE) if s1 is None or s2 is None else (int(s1), int(s2))
+        if tuple(self.scores[row]) == new: return False
+        self.scores[row] = new; self.version += 1
+        return True
+
+    def set_scores(self, rows, scores):
+        """Escribe de una vez los marcadores (array K×2) de las filas `rows`."""
+        if len(rows) == 0: return
+        self.scores[np.asarray(rows, dtype=np.intp)] = np.asarray(scores, dtype=np.int64); self.version += 1
+
+    def row(self, match_id):
+        return self._row.get(match_id)
+
+    def compute(self, scores=None):
+        """Estadísticas por entidad (dict clave -> array de longitud nº entidades)."""
+        scores = self.scores if scores is None else scores
+        played = scores[:, 0] >= 0
+        return self._stats(self.sides[played], scores[played, 0].astype(np.int64), scores[played, 1].astype(np.int64))
+
+    def _stats(self, sides, s1, s2):
+        num = len(self.entities); width = sides.shape[2]
+        ent1, ent2 = sides[:, 0, :].ravel(), sides[:, 1, :].ravel()
+        both = np.concatenate((ent1, ent2))
+
+        def per_entity(values1, values2):
+            # Cada valor por partido se reparte a las `width` entidades de su lado
+            weights = np.concatenate((np.repeat(values1, width), np.repeat(values2, width)))
+            return np.bincount(both, weights=weights, minlength=num).astype(np.int64)
+
+        stats = {'JG': per_entity(s1, s2), 'JR': per_entity(s2, s1), 'PG': per_entity(s1 > s2, s2 > s1), 'PE': per_entity(s1 == s2, s1 == s2)}
+        stats['PJ'] = np.bincount(both, minlength=num).astype(np.int64)
+        stats['PP'] = stats['PJ'] - stats['PG'] - stats['PE']; stats['DG'] = stats['JG'] - stats['JR']
+        return stats
+
+    @staticmethod
+    def ranking(stats):
+        """Índices de entidad en orden de clasificación (PG, DG, JG descendente; empates por orden de alta)."""
+        return np.lexsort((np.arange(len(stats['PG'])), -stats['JG'], -stats['DG'], -stats['PG']))
+
+    def standings(self, stats=None):
+        """Clasificación en el formato de calculate_standings_*: (dict entidad -> stats, claves ordenadas)."""
+        stats = self.compute() if stats is None else stats
+        columns = {k: stats[k].tolist() for k in STAT_KEYS}
+        standings = {e: {k: columns[k][i] for k in STAT_KEYS} for i, e in enumerate(self.entities)}
+        return standings, [self.entities[i] for i in self.ranking(stats)]
+
+    def to_dataframe(self, entity_label, stats=None):
+        """DataFrame de clasificación (índice 'Pos') construido directamente desde los arrays."""
+        import pandas as pd
+        stats = self.compute() if stats is None else stats
+        order = self.ranking(stats); names = np.array(self.entities, dtype=object)
+        data = {entity_label: names[order]}
+        data.update({k: stats[k][order] for k in ('PJ', 'PG', 'PE', 'PP', 'JG', 'JR', 'DG')})
+        return pd.DataFrame(data, index=pd.Index(np.arange(1, len(order) + 1), name='Pos'))
@@ -0,0 +1,10 @@
+"""Exportación de clasificaciones a texto plano."""
+
+
+def generate_standings_text(standings_data, sorted_keys, tournament_name, is_pairs=False):
+    """Tabla de clasificación en texto de ancho fijo (la que se descarga como .txt)."""
+    entity_label = "Pareja" if is_pairs else "Jugador"; header = f"--- CLASIFICACIÓN: {tournament_name} ({entity_label}) ---\n"; separator = "-"*75+"\n"; col_headers = f"{'Pos':<4} {entity_label:<30} {'PJ':<4} {'PG':<4} {'PE':<4} {'PP':<4} {'JG':<6} {'JR':<6} {'DG':<6}\n"
+    lines = [header, separator, col_headers, separator]
+    for i, key in enumerate(sorted_keys):
+        stats = standings_data.get(key, {}); lines.append(f"{i+1:<4} {key:<30} {stats.get('PJ',0):<4} {stats.get('PG',0):<4} {stats.get('PE',0):<4} {stats.get('PP',0):<4} {stats.get('JG',0):<6} {stats.get('JR',0):<6} {stats.get('DG',0):<6}\n")
+    lines.append(separator); return "".join(lines)
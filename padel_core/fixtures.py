@@ -0,0 +1,129 @@
+"""
+Generación de fixtures sin dependencias de interfaz.
+
+Los problemas que impiden generar un fixture se señalan con `FixtureError`; los
+avisos no bloqueantes se devuelven en la lista `fixture["warnings"]`.
+"""
+from collections import deque
+
+from .americano import AmericanoScheduler, build_americano_fixture, fixture_quality
+from .scheduling import pack_matches, schedule_info, slot_rounds
+
+
+class FixtureError(ValueError):
+    """No se puede generar un fixture con la configuración indicada."""
+
+
+def generate_round_robin_pairs_fixture(pairs_list, num_courts):
+    """
+    Genera un fixture Round Robin para parejas fijas usando el algoritmo
+    estándar (método del círculo), adaptado para parejas, y reparte todos los
+    partidos en turnos de `num_courts` pistas (cada turno es una ronda). Con
+    pistas de sobra salen N-1 rondas de N/2 partidos (N = nº parejas, par);
+    con menos pistas salen más rondas, pero no se pierde ningún partido.
+    """
+    if len(pairs_list) < 2: raise FixtureError("Se necesitan al menos 2 parejas para generar un fixture.")
+    if num_courts < 1: raise FixtureError(f"No se pueden jugar partidos con {num_courts} pistas y {len(pairs_list)} parejas.")
+
+    fixture = {"rounds": [], "warnings": []}
+    all_original_pair_names = [f"{p[0]}/{p[1]}" for p in pairs_list] # Nombres de las parejas originales
+    all_matches = _round_robin_matches(pairs_list, fixture["warnings"])
+    slots = pack_matches(all_matches, num_courts)
+    fixture["rounds"] = slot_rounds(slots, all_original_pair_names, _pair_names)
+    fixture["schedule"] = schedule_info(all_matches, num_courts, len(slots))
+    if not fixture["rounds"]: fixture["warnings"].append("Fixture RR generado sin rondas asignadas.")
+    return fixture
+
+
+def _round_robin_matches(pairs_list, warnings):
+    """Todos los cruces del Round Robin, ronda a ronda del método del círculo (sin pista asignada)."""
+    working_pairs_list = list(pairs_list)
+    if len(working_pairs_list) % 2 != 0: working_pairs_list.append("BYE")
+    n = len(working_pairs_list); rotating_items = deque(working_pairs_list); all_matches = []
+    for _ in range(n - 1):
+        for i in range(n // 2):
+            item1 = rotating_items[i]; item2 = rotating_items[n - 1 - i]
+            if item1 != "BYE" and item2 != "BYE":
+                if isinstance(item1, tuple) and isinstance(item2, tuple):
+                    all_matches.append({"pair1": item1, "pair2": item2, "score1": None, "score2": None})
+                else: warnings.append(f"Error RR interno: {item1} vs {item2}")
+        if len(rotating_items) > 1: last_item = rotating_items.pop(); rotating_items.insert(1, last_item)
+    return all_matches
+
+
+def _pair_names(match):
+    return (f"{match['pair1'][0]}/{match['pair1'][1]}", f"{match['pair2'][0]}/{match['pair2'][1]}")
+
+
+def generate_americano_fixture(players, num_courts, seed=None, full_rounds=False):
+    """
+    Genera un fixture Americano con rotación de compañeros y descansos equilibrados.
+    Con `full_rounds` cada ronda de la rotación es completa (juegan todos) y sus
+    partidos se reparten en turnos de `num_courts` pistas.
+    """
+    if len(players) < 4: raise FixtureError("Min 4 jugadores para Americano.")
+    if num_courts < 1: raise FixtureError("Se necesita al menos 1 pista.")
+    fixture = build_americano_fixture(players, num_courts, seed=seed, full_rounds=full_rounds)
+    if not fixture["rounds"]: raise FixtureError("No se pudieron generar rondas Americano.")
+    return fixture
+
+
+# --- Replanificación a mitad de torneo ---
+def frozen_round_count(fixture_data, results):
+    """Rondas que hay que conservar al replanificar: hasta la última con algún resultado en `results` ({match_id: (s1, s2)})."""
+    frozen = 0
+    for pos, round_data in enumerate((fixture_data or {}).get("rounds", []), start=1):
+        round_num = round_data.get("round_num")
+        if any(f"r{round_num}_m{i}" in results for i in range(len(round_data.get("matches", [])))): frozen = pos
+    return frozen
+
+
+def replan_round_robin_pairs_fixture(fixture_data, pairs_list, num_courts, frozen_rounds, withdrawn=()):
+    """
+    Conserva las `frozen_rounds` primeras rondas y vuelve a repartir en turnos
+    los cruces que faltan entre las parejas activas (`pairs_list` sin las de
+    `withdrawn`, por nombre "A/B"). Los cruces ya programados en las rondas
+    conservadas no se repiten; los identificadores de partido de esas rondas no cambian.
+    """
+    withdrawn = set(withdrawn) | set((fixture_data or {}).get("withdrawn", []))
+    active_pairs = [p for p in pairs_list if f"{p[0]}/{p[1]}" not in withdrawn]
+    if len(active_pairs) < 2: raise FixtureError("Se necesitan al menos 2 parejas activas para replanificar.")
+    if num_courts < 1: raise FixtureError("Se necesita al menos 1 pista.")
+    frozen = [dict(r) for r in (fixture_data or {}).get("rounds", [])[:frozen_rounds]]
+    played = {frozenset((tuple(m["pair1"]), tuple(m["pair2"]))) for r in frozen for m in r.get("matches", [])}
+    fixture = {"rounds": list(frozen), "warnings": [], "withdrawn": sorted(withdrawn)}
+    pending = [m for m in _round_robin_matches(active_pairs, fixture["warnings"]) if frozenset((m["pair1"], m["pair2"])) not in played]
+    slots = pack_matches(pending, num_courts)
+    fixture["rounds"] += slot_rounds(slots, [f"{p[0]}/{p[1]}" for p in active_pairs], _pair_names, start_round=len(frozen) + 1)
+    fixture["schedule"] = schedule_info(pending, num_courts, len(fixture["rounds"]), frozen)
+    return fixture
+
+
+def replan_americano_fixture(fixture_data, players, num_courts, frozen_rounds, withdrawn=(), remaining_rounds=None, full_rounds=False, seed=None):
+    """
+    Conserva las `frozen_rounds` primeras rondas y genera de nuevo las
+    siguientes con los jugadores activos (`players` sin los de `withdrawn`),
+    partiendo del historial de compañeros, rivales y descansos de las rondas
+    conservadas. `remaining_rounds` = nº de rondas (turnos) a generar; por defecto
+    las mismas que quedaban. Con `full_rounds` las rondas de la rotación son
+    completas y se reparten en turnos de `num_courts` pistas.
+    """
+    withdrawn = set(withdrawn) | set((fixture_data or {}).get("withdrawn", []))
+    active = [p for p in players if p not in withdrawn]
+    if len(active) < 4: raise FixtureError("Min 4 jugadores activos para Americano.")
+    if num_courts < 1: raise FixtureError("Se necesita al menos 1 pista.")
+    rounds = (fixture_data or {}).get("rounds", [])
+    frozen = [dict(r) for r in rounds[:frozen_rounds]]
+    if remaining_rounds is None: remaining_rounds = len(rounds) - len(frozen)
+    per_round = len(active) // 4 if full_rounds else min(num_courts, len(active) // 4)
+    scheduler = AmericanoScheduler(active, per_round, seed=seed)
+    for round_data in frozen: scheduler.record_round(round_data)
+    # Con rondas completas, cuántas rondas de la rotación llenan aproximadamente los turnos pedidos
+    rotation_rounds = max(1, round(remaining_rounds * num_courts / per_round)) if full_rounds and remaining_rounds > 0 else remaining_rounds
+    new_rounds = [scheduler.next_round() for _ in range(rotation_rounds)]
+    if full_rounds and new_rounds: new_rounds = slot_rounds(pack_matches([m for r in new_rounds for m in r["matches"]], num_courts), active)
+    for offset, round_data in enumerate(new_rounds): round_data["round_num"] = len(frozen) + offset + 1
+    fixture = {"rounds": frozen + new_rounds, "withdrawn": sorted(withdrawn)}
+    fixture["quality"] = fixture_quality(fixture, active)
+    fixture["schedule"] = schedule_info([m for r in new_rounds for m in r["matches"]], num_courts, len(fixture["rounds"]), frozen)
+    return fixture
@@ -0,0 +1,163 @@
+"""
+Torneos por grupos con eliminatoria final.
+
+Los jugadores (Americano) o parejas (parejas fijas) se reparten en N grupos por
+serpiente según su orden de alta (cabezas de serie), cada grupo genera su
+propio fixture de forma independiente (en varios procesos si el torneo es
+grande) y todos los partidos se reparten después en los turnos de un mismo
+conjunto de pistas. Los primeros de cada grupo pasan a un cuadro de
+eliminatoria con siembra cruzada y exenciones hasta la potencia de 2.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .americano import build_americano_fixture
+from .fixtures import FixtureError, generate_round_robin_pairs_fixture
+from .scheduling import match_players, pack_matches, schedule_info, slot_rounds
+
+# El coste de generar un grupo crece con el cuadrado de su tamaño (medido: ~15 ms con 64 jugadores, ~0,27 s con 256,
+# ~1,2 s con 512) y arrancar el pool (forkserver/spawn e importar el paquete en cada proceso) cuesta de 0,3 a 1 s:
+# solo compensa cuando cada grupo tarda más que eso. Por debajo se generan en serie aunque haya varias CPU
+PARALLEL_MIN_GROUP_SIZE = 512
+
+
+def group_name(index):
+    """0 -> 'A', 1 -> 'B', ..., 26 -> 'AA'."""
+    name = ""
+    index += 1
+    while index: index, rest = divmod(index - 1, 26); name = chr(ord("A") + rest) + name
+    return name
+
+
+def seed_groups(entities, num_groups):
+    """Reparto por serpiente: 1º, 2º, ... al grupo A, B, ... y de vuelta (la 2ª fila empieza por el último grupo)."""
+    if num_groups < 1: raise FixtureError("Se necesita al menos 1 grupo.")
+    groups = [[] for _ in range(num_groups)]
+    for pos, entity in enumerate(entities):
+        row, col = divmod(pos, num_groups)
+        groups[col if row % 2 == 0 else num_groups - 1 - col].append(entity)
+    return groups
+
+
+def entity_name(entity):
+    """Nombre con el que puntúa una entidad: el jugador, o "A/B" para una pareja."""
+    return f"{entity[0]}/{entity[1]}" if isinstance(entity, (list, tuple)) else entity
+
+
+def _group_rounds(args):
+    """Rondas (listas de partidos) de un grupo, con tantas pistas como admita el grupo. Se ejecuta en un proceso aparte."""
+    entities, is_pairs, seed = args
+    if is_pairs: return [r["matches"] for r in generate_round_robin_pairs_fixture(entities, max(1, len(entities) // 2))["rounds"]]
+    return [r["matches"] for r in build_americano_fixture(entities, len(entities) // 4, seed=seed)["rounds"]]
+
+
+def generate_group_fixture(entities, num_groups, num_courts, is_pairs=False, seed=None, workers=None):
+    """
+    Fixture de fase de grupos sobre un conjunto común de `num_courts` pistas.
+    `entities` son jugadores (Americano) o tuplas de pareja, en orden de cabezas
+    de serie. Cada grupo se genera por separado (en `workers` procesos, None = nº
+    de CPUs, si los grupos tienen al menos PARALLEL_MIN_GROUP_SIZE entidades) y sus rondas se intercalan antes de
+    repartirlas en turnos. `fixture['groups']` guarda los nombres de cada grupo.
+    """
+    groups = seed_groups(list(entities), num_groups); minimum = 2 if is_pairs else 4
+    if any(len(g) < minimum for g in groups):
+        raise FixtureError(f"Cada grupo necesita al menos {minimum} {'parejas' if is_pairs else 'jugadores'}: hay {len(entities)} para {num_groups} grupos.")
+    if num_courts < 1: raise FixtureError("Se necesita al menos 1 pista.")
+    tasks = [(g, is_pairs, None if seed is None else seed + i) for i, g in enumerate(groups)]
+    workers = min(len(groups), workers or os.cpu_count() or 1)
+    if workers == 1 or max(map(len, groups)) < PARALLEL_MIN_GROUP_SIZE: group_rounds = [_group_rounds(t) for t in tasks]
+    else:
+        context = multiprocessing.get_context("forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool: group_rounds = list(pool.map(_group_rounds, tasks))
+    # Ronda 1 de todos los grupos, luego la ronda 2, ...: así todos los grupos avanzan a la vez
+    matches = [m for round_idx in range(max(map(len, group_rounds))) for rounds in group_rounds if round_idx < len(rounds) for m in rounds[round_idx]]
+    rounds = slot_rounds(pack_matches(matches, num_courts), [entity_name(e) for e in entities], _side_names if is_pairs else match_players)
+    return {"rounds": rounds, "groups": [[entity_name(e) for e in g] for g in groups], "schedule": schedule_info(matches, num_courts, len(rounds))}
+
+
+def _side_names(match):
+    return entity_name(match["pair1"]), entity_name(match["pair2"])
+
+
+def group_standings(sorted_keys, groups):
+    """Clasificación de cada grupo a partir de la clasificación general (mismo criterio PG, DG, JG)."""
+    position = {key: pos for pos, key in enumerate(sorted_keys)}
+    return [sorted(group, key=lambda e: position.get(e, len(position))) for group in groups]
+
+
+def group_qualifiers(sorted_keys, groups, per_group):
+    """Clasificados con siembra cruzada: todos los 1º (por orden de grupo), luego los 2º, etc."""
+    tables = group_standings(sorted_keys, groups)
+    return [table[rank] for rank in range(per_group) for table in tables if rank < len(table)]
+
+
+def playoff_pairs(players):
+    """Forma parejas de eliminatoria en Americano: el mejor clasificado con el peor, el 2º con el penúltimo..."""
+    if len(players) % 2: raise FixtureError("Se necesita un nº par de clasificados para formar parejas.")
+    half = len(players) // 2
+    return [f"{players[i]}/{players[-1 - i]}" for i in range(half)]
+
+
+def _bracket_order(size):
+    """Orden de las cabezas de serie en el cuadro (1 y 2 solo se cruzan en la final): 8 -> 1, 8, 4, 5, 2, 7, 3, 6."""
+    order = [1]
+    while len(order) < size: n = 2 * len(order); order = [s for seed in order for s in (seed, n + 1 - seed)]
+    return order
+
+
+def knockout_bracket(entries):
+    """
+    Cuadro de eliminatoria para `entries` (en orden de siembra). Se completa con
+    exenciones (None) hasta la potencia de 2 siguiente; las exenciones tocan a
+    los mejores sembrados. Devuelve {'size', 'entries', 'scores'} (los marcadores
+    se guardan con los dos contendientes: {"r{ronda}_m{partido}": [s1, s2, entry1, entry2]},
+    ver `bracket_score`).
+    """
+    if len(entries) < 2: raise FixtureError("Se necesitan al menos 2 clasificados para la eliminatoria.")
+    size = 1
+    while size < len(entries): size *= 2
+    return {"size": size, "entries": list(entries), "scores": {}}
+
+
+def bracket_score(s1, s2, entry1, entry2):
+    """Marcador de un cruce tal como se guarda en `bracket['scores']`: vale solo mientras se enfrenten esos dos."""
+    return [s1, s2, entry1, entry2]
+
+
+def _valid_score(score, round_num, entry1, entry2):
+    """(s1, s2) si el marcador guardado es de estos dos contendientes; si no, None."""
+    if score is None: return None
+    # Si se corrige un resultado anterior cambian los contendientes y el marcador de después deja de valer.
+    # Los guardados sin contendientes (solo [s1, s2]) valen en la 1ª ronda, que no depende de otros resultados
+    valid = list(score[2:4]) == [entry1, entry2] if len(score) >= 4 else round_num == 1
+    return (score[0], score[1]) if valid else None
+
+
+def round_label(num_matches):
+    return {1: "Final", 2: "Semifinales", 4: "Cuartos de final", 8: "Octavos de final"}.get(num_matches, f"Ronda de {2 * num_matches}")
+
+
+def resolve_bracket(bracket):
+    """
+    Rondas del cuadro con los cruces conocidos según los marcadores guardados:
+    [{'label', 'matches': [{'match_id', 'entry1', 'entry2', 'score', 'winner'}]}]. Un
+    cruce contra una exención lo gana el otro sin jugar; un empate no hace ganador.
+    `score` es (s1, s2), o None si no hay marcador guardado para esos dos contendientes.
+    """
+    entries = bracket["entries"]; scores = bracket.get("scores", {})
+    slots = [entries[seed - 1] if seed <= len(entries) else None for seed in _bracket_order(bracket["size"])]
+    rounds = []; round_num = 1
+    while len(slots) > 1:
+        matches = []; winners = []
+        for m in range(len(slots) // 2):
+            entry1, entry2 = slots[2 * m], slots[2 * m + 1]; match_id = f"r{round_num}_m{m}"; winner = None; score = None
+            # Solo en la 1ª ronda un hueco vacío es una exención; después es un ganador aún por decidir
+            if round_num == 1 and (entry1 is None or entry2 is None): winner = entry1 if entry2 is None else entry2
+            elif entry1 is not None and entry2 is not None:
+                score = _valid_score(scores.get(match_id), round_num, entry1, entry2)
+                if score is not None and score[0] != score[1]: winner = entry1 if score[0] > score[1] else entry2
+            matches.append({"match_id": match_id, "entry1": entry1, "entry2": entry2, "score": score, "winner": winner}); winners.append(winner)
+        rounds.append({"label": round_label(len(matches)), "matches": matches})
+        slots = winners; round_num += 1
+    return rounds
@@ -0,0 +1,90 @@
+"""
+Importación de resultados por lotes (CSV o JSON).
+
+Cada registro identifica el partido por `match_id` ("r3_m1"), por ronda + pista
+(`round`, `court`) o por ronda + índice de partido (`round`, `match`, empezando
+en 0 como en el `match_id`), y trae `score1`/`score2` (vacíos = borrar el
+resultado; como mucho MAX_SCORE juegos por lado). También se aceptan los nombres en castellano (`ronda`, `pista`,
+`partido`, `juegos1`, `juegos2`).
+
+El lote se valida entero contra el fixture antes de aplicar nada: si hay
+errores no se aplica ningún resultado. Los ficheros se leen como UTF-8 y, si no
+lo son, como Windows-1252 (lo que suele exportar Excel).
+"""
+import csv
+import io
+import json
+
+from .ledger import MAX_SCORE
+
+# Codificaciones que se prueban, en orden, con un fichero en bytes
+ENCODINGS = ("utf-8-sig", "cp1252")
+_ALIASES = {"ronda": "round", "pista": "court", "partido": "match", "juegos1": "score1", "juegos2": "score2", "id": "match_id"}
+
+
+class IngestError(ValueError):
+    """El lote de resultados no es válido; `errors` contiene un mensaje por problema."""
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} errores en el lote de resultados: " + "; ".join(errors[:5]) + (" ..." if len(errors) > 5 else ""))
+        self.errors = errors
+
+
+def _decode(data):
+    for encoding in ENCODINGS:
+        try: return data.decode(encoding)
+        except UnicodeDecodeError: continue
+    raise IngestError([f"No se puede leer el fichero: la codificación no es {' ni '.join(ENCODINGS)}."])
+
+
+def parse_results(data, fmt):
+    """Convierte el contenido (str o bytes) de un fichero CSV o JSON en una lista de registros. Lanza IngestError si no se puede leer."""
+    if isinstance(data, bytes): data = _decode(data)
+    fmt = fmt.lower().lstrip(".")
+    if fmt == "csv":
+        try: records = list(csv.DictReader(io.StringIO(data)))
+        except csv.Error as exc: raise IngestError([f"CSV no válido: {exc}"]) from exc
+    elif fmt == "json":
+        try: loaded = json.loads(data)
+        except json.JSONDecodeError as exc: raise IngestError([f"JSON no válido: {exc}"]) from exc
+        records = loaded.get("results", []) if isinstance(loaded, dict) else loaded
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records): raise IngestError(["Se esperaba una lista de resultados."])
+    else: raise IngestError([f"Formato no soportado: {fmt}"])
+    return [{_ALIASES.get(k.strip().lower(), k.strip().lower()): v for k, v in r.items() if k} for r in records]
+
+
+def _as_int(value):
+    if value is None or (isinstance(value, str) and not value.strip()): return None
+    if isinstance(value, bool): raise ValueError(value)
+    if isinstance(value, float) and not value.is_integer(): raise ValueError(value)
+    return int(value.strip() if isinstance(value, str) else value)
+
+
+def resolve_results(records, fixture_data):
+    """
+    Valida los registros contra el fixture y devuelve {match_id: (s1, s2)}
+    ((None, None) = borrar resultado). Lanza IngestError con todos los problemas encontrados.
+    """
+    by_id = {}; by_court = {}
+    for round_data in (fixture_data or {}).get("rounds", []):
+        round_num = round_data.get("round_num")
+        for match_idx, match in enumerate(round_data.get("matches", [])):
+            match_id = f"r{round_num}_m{match_idx}"; by_id[match_id] = match_id
+            if match.get("court") is not None: by_court[(round_num, match["court"])] = match_id
+    updates = {}; errors = []
+    for line, rec in enumerate(records, start=1):
+        try:
+            if rec.get("match_id"): match_id = by_id.get(str(rec["match_id"]).strip())
+            elif _as_int(rec.get("court")) is not None: match_id = by_court.get((_as_int(rec.get("round")), _as_int(rec.get("court"))))
+            elif _as_int(rec.get("match")) is not None: match_id = by_id.get(f"r{_as_int(rec.get('round'))}_m{_as_int(rec.get('match'))}")
+            else: errors.append(f"Registro {line}: falta match_id, pista o partido"); continue
+            s1, s2 = _as_int(rec.get("score1")), _as_int(rec.get("score2"))
+        except (TypeError, ValueError): errors.append(f"Registro {line}: valores no numéricos"); continue
+        if match_id is None: errors.append(f"Registro {line}: el partido no existe en el fixture"); continue
+        if (s1 is None) != (s2 is None): errors.append(f"Registro {line}: falta uno de los dos marcadores"); continue
+        if s1 is not None and (s1 < 0 or s2 < 0): errors.append(f"Registro {line}: marcador negativo"); continue
+        if s1 is not None and (s1 > MAX_SCORE or s2 > MAX_SCORE): errors.append(f"Registro {line}: marcador mayor que {MAX_SCORE} juegos"); continue
+        if match_id in updates and updates[match_id] != (s1, s2): errors.append(f"Registro {line}: {match_id} aparece repetido con otro marcador"); continue
+        updates[match_id] = (s1, s2)
+    if errors: raise IngestError(errors)
+    return updates
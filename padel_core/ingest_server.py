@@ -0,0 +1,77 @@
+"""
+Endpoint HTTP local para recibir lotes de resultados (p. ej. desde las tablets de pista).
+
+    python -m padel_core.ingest_server --db torneos.db --port 8765
+
+    POST /tournaments/<id>/results
+        Content-Type: application/json  ->  [{"round": 1, "court": 2, "score1": 6, "score2": 4}, ...]
+        Content-Type: text/csv          ->  round,court,score1,score2
+
+Cada lote se valida entero contra el fixture guardado y se escribe en una sola
+transacción en el almacén SQLite; la app lo recoge con "Sincronizar resultados".
+Responde 200 {"applied": n}, 400 {"errors": [...]}, 404, o 503/500 {"errors": [...]}
+si el almacén no puede leer o guardar el lote (base bloqueada u otro error).
+"""
+import argparse
+import json
+import re
+import sqlite3
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .ingest import IngestError, parse_results, resolve_results
+from .store import TournamentStore
+
+MAX_BODY_BYTES = 5 * 1024 * 1024
+_RESULTS_PATH_RE = re.compile(r"^/tournaments/(\d+)/results/?$")
+
+
+class ResultsHandler(BaseHTTPRequestHandler):
+    server_version = "PadelIngest/1.0"
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status); self.send_header("Content-Type", "application/json; charset=utf-8"); self.send_header("Content-Length", str(len(body))); self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        match = _RESULTS_PATH_RE.match(self.path.split("?", 1)[0])
+        if not match: return self._send(404, {"errors": ["Ruta no encontrada"]})
+        try: length = int(self.headers.get("Content-Length") or 0)
+        except ValueError: length = -1
+        if length < 0: return self._send(400, {"errors": ["Cabecera Content-Length no válida"]})
+        if length > MAX_BODY_BYTES: return self._send(413, {"errors": [f"Lote demasiado grande (máx. {MAX_BODY_BYTES} bytes)"]})
+        body = self.rfile.read(length); tournament_id = int(match.group(1))
+        try:
+            data = self.server.store.load_tournament(tournament_id)
+            if data is None: return self._send(404, {"errors": [f"No existe el torneo #{tournament_id}"]})
+            fmt = "csv" if "csv" in (self.headers.get("Content-Type") or "") else "json"
+            try: updates = resolve_results(parse_results(body, fmt), data["fixture"])
+            except IngestError as exc: return self._send(400, {"errors": exc.errors})
+            self.server.store.save_results(tournament_id, updates)
+        except sqlite3.OperationalError as exc: return self._send(503, {"errors": [f"Almacén no disponible, reintenta: {exc}"]}) # p. ej. base bloqueada
+        except (sqlite3.Error, ValueError, OverflowError) as exc: return self._send(500, {"errors": [f"No se ha podido guardar el lote: {exc}"]})
+        self._send(200, {"applied": len(updates)})
+
+    def log_message(self, format, *args):
+        pass  # Sin ruido por petición; los errores se devuelven en la respuesta
+
+
+def make_server(db_path, host="127.0.0.1", port=8765):
+    server = ThreadingHTTPServer((host, port), ResultsHandler)
+    server.store = TournamentStore(db_path)
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m padel_core.ingest_server", description="Recibe lotes de resultados por HTTP y los guarda en el almacén SQLite.")
+    parser.add_argument("--db", default="torneos.db"); parser.add_argument("--host", default="127.0.0.1"); parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+    server = make_server(args.db, args.host, args.port)
+    print(f"Escuchando en http://{args.host}:{args.port}/tournaments/<id>/results (base de datos: {args.db})")
+    try: server.serve_forever()
+    except KeyboardInterrupt: pass
+    finally: server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Clasificación incremental ("libro mayor") de un torneo.
+
+En lugar de recorrer todas las rondas en cada recarga, el libro guarda el último
+resultado aplicado a cada partido y, cuando cambia un marcador, resta la
+contribución anterior y suma la nueva. El ranking (PG, DG, JG) se mantiene
+ordenado y solo se recolocan las entidades del partido modificado. Si tiene un
+`ResultsModel` asociado, cada marcador se copia también a sus arrays (antes que
+al libro, para que un error no los deje desalineados).
+"""
+from bisect import bisect_left, insort
+
+STAT_KEYS = ("JG", "JR", "DG", "PG", "PP", "PE", "PJ")
+# Juegos máximos de un lado en un partido: acota marcadores absurdos en la entrada
+MAX_SCORE = 99
+
+
+def checked_score(value):
+    """Marcador de un lado como entero, o None. Lanza ValueError si no está entre 0 y MAX_SCORE."""
+    if value is None: return None
+    score = int(value)
+    if not 0 <= score <= MAX_SCORE: raise ValueError(f"Marcador fuera de rango (0-{MAX_SCORE}): {score}")
+    return score
+
+
+def match_sides(match, is_pairs=False):
+    """
+    Entidades que puntúan por cada lado de un partido: los dos jugadores de cada
+    pareja en Americano, o el nombre "A/B" de la pareja en Parejas Fijas.
+    Devuelve None si el partido no tiene el formato esperado.
+    """
+    pair1, pair2 = match.get('pair1'), match.get('pair2')
+    if not isinstance(pair1, (list, tuple)) or len(pair1) != 2 or not isinstance(pair2, (list, tuple)) or len(pair2) != 2: return None
+    if is_pairs: return (f"{pair1[0]}/{pair1[1]}",), (f"{pair2[0]}/{pair2[1]}",)
+    return tuple(pair1), tuple(pair2)
+
+
+class StandingsLedger:
+    """Clasificación que se actualiza por diferencias con cada resultado."""
+
+    def __init__(self, entities, model=None):
+        self.entities = list(entities)
+        self.model = model  # ResultsModel opcional con los mismos marcadores en columnas
+        self._position = {e: i for i, e in enumerate(self.entities)}
+        self.standings = {e: {k: 0 for k in STAT_KEYS} for e in self.entities}
+        self._results = {}  # match_id -> (lado1, lado2, s1, s2)
+        self._sides = {}  # match_id -> (lado1, lado2) de todos los partidos del fixture (para lotes)
+        self._ranking = sorted(self._rank_key(e) for e in self.entities)
+        self.version = 0  # Se incrementa con cada cambio efectivo (útil para cachear vistas)
+
+    @classmethod
+    def from_scores(cls, entities, fixture_data, scores, is_pairs=False):
+        """
+        Construye el libro (con su `ResultsModel`) leyendo los marcadores
+        `score1_*`/`score2_*` ya existentes en `scores`.
+        """
+        from .columnar import ResultsModel # Import diferido: columnar usa match_sides de este módulo
+        ledger = cls(entities, ResultsModel(entities, fixture_data, is_pairs))
+        for round_data in (fixture_data or {}).get('rounds', []):
+            for match_idx, match in enumerate(round_data.get('matches', [])):
+                sides = match_sides(match, is_pairs)
+                if sides is None: continue
+                match_id = f"r{round_data.get('round_num', '?')}_m{match_idx}"; ledger._sides[match_id] = sides
+                s1, s2 = scores.get(f"score1_{match_id}"), scores.get(f"score2_{match_id}")
+                if s1 is None or s2 is None: continue
+                try: ledger.apply(match_id, sides[0], sides[1], s1, s2)
+                except ValueError: continue # Un marcador guardado fuera de rango no tumba la carga del torneo
+        return ledger
+
+    def _rank_key(self, entity):
+        # Mismo criterio que calculate_standings_*: PG, DG, JG descendente; empates por orden de alta
+        stats = self.standings[entity]
+        return (-stats['PG'], -stats['DG'], -stats['JG'], self._position[entity])
+
+    def _contribute(self, side1, side2, s1, s2, sign):
+        res1, res2 = ('PG', 'PP') if s1 > s2 else ('PP', 'PG') if s2 > s1 else ('PE', 'PE')
+        for side, won, lost, res in ((side1, s1, s2, res1), (side2, s2, s1, res2)):
+            for e in side:
+                stats = self.standings.get(e)
+                if stats is None: continue
+                stats['JG'] += sign * won; stats['JR'] += sign * lost; stats['DG'] = stats['JG'] - stats['JR']
+                stats['PJ'] += sign; stats[res] += sign
+
+    def apply(self, match_id, side1, side2, s1, s2):
+        """
+        Registra (o corrige) el resultado de un partido. Con `s1` o `s2` a None se
+        elimina el resultado. Devuelve True si la clasificación ha cambiado. Lanza
+        ValueError (sin cambiar nada) si un marcador no está entre 0 y MAX_SCORE.
+        """
+        s1 = checked_score(s1); s2 = checked_score(s2)
+        new = (tuple(side1), tuple(side2), s1, s2) if s1 is not None and s2 is not None else None
+        old = self._results.get(match_id)
+        if old == new: return False
+        affected = [e for e in {*side1, *side2, *(old[0] + old[1] if old else ())} if e in self.standings]
+        old_keys = [self._rank_key(e) for e in affected]
+        if self.model is not None: self.model.set_score(match_id, s1, s2)
+        self._replace(match_id, old, new)
+        for key in old_keys: del self._ranking[bisect_left(self._ranking, key)]
+        for e in affected: insort(self._ranking, self._rank_key(e))
+        self.version += 1
+        return True
+
+    def apply_many(self, results):
+        """
+        Aplica un lote {match_id: (s1, s2)} de una vez: actualiza totales y
+        modelo, reordena el ranking una sola vez y sube `version` una sola vez.
+        Solo conoce los partidos del fixture si se creó con `from_scores`; el resto
+        se ignoran. Devuelve cuántos partidos cambian. Si algún marcador no está
+        entre 0 y MAX_SCORE lanza ValueError sin aplicar ninguno.
+        """
+        updates = []; rows = []; row_scores = []
+        for match_id, (s1, s2) in results.items():
+            sides = self._sides.get(match_id)
+            if sides is None: continue
+            s1 = checked_score(s1); s2 = checked_score(s2)
+            new = (sides[0], sides[1], s1, s2) if s1 is not None and s2 is not None else None
+            old = self._results.get(match_id)
+            if old == new: continue
+            updates.append((match_id, old, new))
+            row = self.model.row(match_id) if self.model is not None else None
+            if row is not None: rows.append(row); row_scores.append((s1, s2) if new else (-1, -1))
+        # Todo validado: primero el modelo y después los totales del libro
+        if rows: self.model.set_scores(rows, row_scores)
+        for match_id, old, new in updates: self._replace(match_id, old, new)
+        changed = len(updates)
+        if changed: self._ranking = sorted(self._rank_key(e) for e in self.entities); self.version += 1
+        return changed
+
+    def _replace(self, match_id, old, new):
+        if old: self._contribute(*old, sign=-1)
+        if new: self._contribute(*new, sign=1); self._results[match_id] = new
+        else: self._results.pop(match_id, None)
+
+    def result(self, match_id):
+        """Marcador (s1, s2) registrado para un partido, o None."""
+        entry = self._results.get(match_id)
+        return (entry[2], entry[3]) if entry else None
+
+    def results(self):
+        """Todos los marcadores registrados: {match_id: (s1, s2)}."""
+        return {match_id: (entry[2], entry[3]) for match_id, entry in self._results.items()}
+
+    def sorted_keys(self):
+        """Entidades ordenadas por clasificación."""
+        return [self.entities[key[3]] for key in self._ranking]
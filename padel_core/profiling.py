@@ -0,0 +1,204 @@
+"""
+Instrumentación opcional de las recargas de la app.
+
+Un `Profiler` cronometra etapas (`with profiler.stage("standings"): ...`) y
+cuenta sucesos por recarga (`profiler.count("widgets", 2)`). Guarda como mucho
+`max_samples` muestras por etapa (las más recientes) y calcula p50/p95/p99 bajo
+demanda. `NULL_PROFILER` tiene la misma interfaz y no hace nada, así que con la
+instrumentación desactivada el coste es una llamada a método.
+
+Los widgets creados y las lecturas de `st.session_state` se cuentan en un solo
+sitio: `instrument_streamlit` envuelve el módulo `streamlit` de la app (y los
+contenedores que devuelve) solo cuando el perfilador está activo.
+"""
+import json
+import math
+import threading
+import time
+from collections import deque
+
+ENV_VAR = "PADEL_PROFILE"
+DUMP_PATH_ENV_VAR = "PADEL_PROFILE_DUMP"
+DEFAULT_DUMP_PATH = "perfil_padel.json"
+# Contadores que se guardan en todas las recargas (con 0 si no ha habido ninguno)
+COUNTERS = ("widgets", "session_state_reads")
+# Funciones de Streamlit que crean un widget y funciones que devuelven contenedores en los que se crean más
+WIDGET_FUNCTIONS = frozenset(("button", "camera_input", "chat_input", "checkbox", "color_picker", "data_editor", "date_input", "download_button", "feedback",
+                              "file_uploader", "form_submit_button", "multiselect", "number_input", "pills", "radio", "segmented_control", "select_slider",
+                              "selectbox", "slider", "text_area", "text_input", "time_input", "toggle"))
+CONTAINER_FUNCTIONS = frozenset(("columns", "container", "empty", "expander", "form", "popover", "status", "tabs"))
+
+
+def profiling_enabled(environ):
+    """True si la variable de entorno PADEL_PROFILE activa la instrumentación."""
+    return environ.get(ENV_VAR, "").strip().lower() in ("1", "true", "yes", "si", "sí")
+
+
+def percentile(sorted_values, q):
+    """Percentil `q` (0-100) por rango más cercano de una lista ya ordenada."""
+    if not sorted_values: return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class _NullStage:
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler; self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter(); return self
+
+    def __exit__(self, *exc):
+        self._profiler.record(self._name, (time.perf_counter() - self._start) * 1000); return False
+
+
+class Profiler:
+    """Tiempos por etapa y contadores por recarga, con ventanas acotadas de muestras."""
+
+    def __init__(self, enabled=True, max_samples=2000, counter_names=COUNTERS):
+        self.enabled = enabled; self.max_samples = max_samples
+        self._timings = {}  # etapa -> deque de ms
+        self._counters = {}  # contador -> deque de valores por recarga
+        self._pending_counts = {}; self._counter_names = set(counter_names)
+        self.in_rerun = False  # True entre `begin_rerun` y `end_rerun` de una recarga completa
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        """Context manager que cronometra una etapa."""
+        return _Stage(self, name) if self.enabled else _NULL_STAGE
+
+    def record(self, name, ms):
+        if not self.enabled: return
+        with self._lock: self._timings.setdefault(name, deque(maxlen=self.max_samples)).append(ms)
+
+    def count(self, name, n=1):
+        """Suma `n` al contador `name` de la recarga en curso."""
+        if not self.enabled: return
+        with self._lock: self._pending_counts[name] = self._pending_counts.get(name, 0) + n
+
+    def begin_rerun(self):
+        """Marca el comienzo de una recarga completa (lo que se recarga fuera de ella es un fragmento)."""
+        self.in_rerun = self.enabled
+
+    def end_rerun(self, total_ms, name="rerun"):
+        """
+        Cierra la recarga `name` ("rerun" para la completa; p. ej. "fragment_rerun" para
+        la de un fragmento): guarda su duración total y los contadores acumulados,
+        con 0 los que no han salido. Los de un fragmento van a series propias ("<name>.<contador>").
+        """
+        if not self.enabled: return
+        with self._lock:
+            self._timings.setdefault(name, deque(maxlen=self.max_samples)).append(total_ms)
+            pending = self._pending_counts; self._counter_names.update(pending)
+            for counter in self._counter_names:
+                key = counter if name == "rerun" else f"{name}.{counter}"
+                self._counters.setdefault(key, deque(maxlen=self.max_samples)).append(pending.get(counter, 0))
+            self._pending_counts = {}
+            if name == "rerun": self.in_rerun = False
+
+    def summary(self):
+        """Filas {'métrica', 'n', 'p50', 'p95', 'p99', 'máx'} para etapas (ms) y contadores (por recarga)."""
+        with self._lock:
+            series = [(f"{name} (ms)", sorted(values)) for name, values in self._timings.items()]
+            series += [(f"{name} (por recarga)", sorted(values)) for name, values in self._counters.items()]
+        return [{"métrica": label, "n": len(values), "p50": percentile(values, 50), "p95": percentile(values, 95), "p99": percentile(values, 99), "máx": values[-1] if values else 0}
+                for label, values in sorted(series)]
+
+    def dump(self, path):
+        """Escribe todas las muestras guardadas en JSON para analizarlas fuera de la app."""
+        with self._lock:
+            data = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "timings_ms": {k: list(v) for k, v in self._timings.items()},
+                    "counters": {k: list(v) for k, v in self._counters.items()}}
+        with open(path, "w", encoding="utf-8") as fh: json.dump(data, fh, ensure_ascii=False)
+        return path
+
+    def reset(self):
+        with self._lock: self._timings.clear(); self._counters.clear(); self._pending_counts = {}
+
+
+NULL_PROFILER = Profiler(enabled=False)
+
+
+class CountingMapping:
+    """
+    Envuelve un mapeo (p. ej. st.session_state) y cuenta cada lectura (`.get()`,
+    `[clave]`, `.atributo`, `in`, `.pop()`) en el contador `name`. Las escrituras
+    y los borrados pasan tal cual.
+    """
+    __slots__ = ("_mapping", "_profiler", "_name")
+
+    def __init__(self, mapping, profiler, name="session_state_reads"):
+        object.__setattr__(self, "_mapping", mapping); object.__setattr__(self, "_profiler", profiler); object.__setattr__(self, "_name", name)
+
+    def get(self, key, default=None):
+        self._profiler.count(self._name); return self._mapping.get(key, default)
+
+    def pop(self, key, *default):
+        self._profiler.count(self._name); return self._mapping.pop(key, *default)
+
+    def __getitem__(self, key):
+        self._profiler.count(self._name); return self._mapping[key]
+
+    def __getattr__(self, name):
+        self._profiler.count(self._name); return getattr(self._mapping, name)
+
+    def __contains__(self, key):
+        self._profiler.count(self._name); return key in self._mapping
+
+    def __setitem__(self, key, value): self._mapping[key] = value
+    def __setattr__(self, name, value): setattr(self._mapping, name, value)
+    def __delitem__(self, key): del self._mapping[key]
+    def __iter__(self): return iter(self._mapping)
+    def __len__(self): return len(self._mapping)
+    def keys(self): return self._mapping.keys()
+
+
+def instrument_streamlit(st_module, profiler):
+    """El módulo `streamlit` tal cual si `profiler` está desactivado; si no, un `CountingStreamlit` sobre él."""
+    return CountingStreamlit(st_module, profiler) if profiler.enabled else st_module
+
+
+class CountingStreamlit:
+    """
+    Envuelve `streamlit` (o un contenedor suyo) y cuenta en `profiler` los widgets
+    creados ("widgets") y las lecturas de `session_state` ("session_state_reads").
+    Los contenedores que devuelve (columnas, pestañas, expansores, barra lateral...)
+    se envuelven también, para contar los widgets que se crean en ellos.
+    """
+    __slots__ = ("_target", "_profiler")
+
+    def __init__(self, target, profiler):
+        self._target = target; self._profiler = profiler
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if name == "session_state": return CountingMapping(value, self._profiler)
+        if name == "sidebar": return CountingStreamlit(value, self._profiler)
+        if name in WIDGET_FUNCTIONS: return self._widget(value)
+        if name in CONTAINER_FUNCTIONS: return self._container(value)
+        return value
+
+    def _widget(self, func):
+        def widget(*args, **kwargs):
+            self._profiler.count("widgets"); return func(*args, **kwargs)
+        return widget
+
+    def _container(self, func):
+        def container(*args, **kwargs):
+            result = func(*args, **kwargs)
+            if isinstance(result, (list, tuple)): return [CountingStreamlit(r, self._profiler) for r in result]
+            return CountingStreamlit(result, self._profiler)
+        return container
+
+    def __enter__(self): return self._target.__enter__()
+    def __exit__(self, *exc): return self._target.__exit__(*exc)
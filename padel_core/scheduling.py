@@ -0,0 +1,107 @@
+"""
+Reparto de partidos en turnos de pista.
+
+Recibe todos los partidos que hay que jugar (sin recortar) y los coloca en
+turnos de como mucho `num_courts` partidos, sin que nadie juegue dos veces en
+el mismo turno. Se prueban dos criterios voraces y se queda el que usa menos
+turnos: por orden de entrada (cada partido en el primer turno libre de la
+ventana, lo que conserva las rondas completas de una rotación Americano cuando
+las pistas no las dividen) y por carga (primero los partidos de los jugadores
+con más partidos pendientes, que son los que marcan el mínimo de turnos
+restantes, y a igualdad los de quien lleva más turnos esperando, lo que
+reparte los descansos). A igualdad de turnos gana el reparto por carga; el
+resto de empates respeta el orden de entrada, de modo que unas rondas que ya
+caben en las pistas salen tal cual.
+"""
+import heapq
+import math
+from collections import deque
+
+# Partidos pendientes que se evalúan en cada turno (en orden de entrada), como mínimo: acota el coste con fixtures enormes
+MIN_LOOKAHEAD = 64
+
+
+def match_players(match):
+    """Jugadores que ocupan pista en un partido (los de las dos parejas)."""
+    return (*match["pair1"], *match["pair2"])
+
+
+def slot_lower_bound(matches, num_courts):
+    """
+    Mínimo teórico de turnos: por pistas (partidos / partidos por turno, que no
+    pasan de las pistas ni de jugadores / 4) y por el jugador con más partidos.
+    """
+    load = {}
+    for match in matches:
+        for p in match_players(match): load[p] = load.get(p, 0) + 1
+    per_slot = min(num_courts, len(load) // 4)
+    return max(math.ceil(len(matches) / per_slot) if per_slot > 0 else 0, max(load.values(), default=0))
+
+
+def pack_matches(matches, num_courts, lookahead=None):
+    """
+    Reparte `matches` en turnos y devuelve la lista de turnos (listas de partidos,
+    con `court` numerada desde 1 en cada turno). No descarta ningún partido.
+    `lookahead` = nº de partidos pendientes evaluados por turno (None = max(64, 4 × pistas)).
+    """
+    if num_courts < 1: raise ValueError("Se necesita al menos 1 pista.")
+    lookahead = lookahead or max(MIN_LOOKAHEAD, 4 * num_courts)
+    index = {}; players_of = []
+    for match in matches: players_of.append(tuple(index.setdefault(p, len(index)) for p in match_players(match)))
+    by_load = _pack(players_of, len(index), num_courts, lookahead, by_load=True)
+    in_order = _pack(players_of, len(index), num_courts, lookahead, by_load=False)
+    return [[dict(matches[m], court=court + 1) for court, m in enumerate(sorted(slot))] for slot in (in_order if len(in_order) < len(by_load) else by_load)]
+
+
+def _pack(players_of, num_players, num_courts, lookahead, by_load):
+    """Un reparto voraz sobre índices de partido: `by_load` ordena cada ventana por carga y espera; si no, por orden de entrada."""
+    load = [0] * num_players; last = [-1] * num_players
+    for players in players_of:
+        for p in players: load[p] += 1
+    # Cola en orden de entrada: cada turno saca la ventana por la izquierda y devuelve lo no elegido, así cuesta O(ventana) y no O(partidos)
+    pending = deque(range(len(players_of))); slots = []
+    while pending:
+        slot = len(slots); window = [pending.popleft() for _ in range(min(lookahead, len(pending)))]
+        if by_load:
+            # Más carga pendiente primero; luego más espera acumulada; luego orden de entrada. Con un montículo
+            # solo se ordena lo que se llega a mirar (con pocas pistas, unos pocos partidos de la ventana)
+            ranked = [(-max(map(load.__getitem__, players_of[m])), sum(map(last.__getitem__, players_of[m])), m) for m in window]; heapq.heapify(ranked)
+            candidates = (heapq.heappop(ranked)[2] for _ in range(len(ranked)))
+        else: candidates = iter(window) # La ventana ya está en orden de entrada
+        busy = set(); chosen = []
+        for m in candidates:
+            players = players_of[m]
+            if busy.isdisjoint(players):
+                chosen.append(m); busy.update(players)
+                if len(chosen) == num_courts: break
+        for m in chosen:
+            for p in players_of[m]: load[p] -= 1; last[p] = slot
+        chosen_set = set(chosen); pending.extendleft(reversed([m for m in window if m not in chosen_set]))
+        slots.append(chosen)
+    return slots
+
+
+def slot_rounds(slots, entities, entities_of=match_players, start_round=1):
+    """Convierte turnos en rondas del fixture; descansan las `entities` que no salen en `entities_of(partido)`."""
+    rounds = []
+    for offset, slot in enumerate(slots):
+        playing = {e for match in slot for e in entities_of(match)}
+        rounds.append({"round_num": start_round + offset, "matches": slot, "resting": [e for e in entities if e not in playing]})
+    return rounds
+
+
+def schedule_info(matches, num_courts, num_slots, frozen_rounds=()):
+    """
+    Resumen que los generadores guardan en `fixture['schedule']`. `frozen_rounds` son
+    rondas ya fijadas (p. ej. las conservadas al replanificar) que van antes de
+    `matches`: cuentan sus partidos y sus turnos, y el mínimo solo se calcula para `matches`.
+    """
+    frozen_matches = sum(len(r.get("matches", [])) for r in frozen_rounds)
+    return {"courts": num_courts, "matches": frozen_matches + len(matches), "slots": num_slots, "lower_bound": len(frozen_rounds) + slot_lower_bound(matches, num_courts)}
+
+
+def projected_duration(num_slots, minutes_per_match, changeover_minutes=0):
+    """Minutos previstos para jugar `num_slots` turnos (con `changeover_minutes` entre turnos)."""
+    if num_slots <= 0: return 0
+    return num_slots * minutes_per_match + (num_slots - 1) * changeover_minutes
+
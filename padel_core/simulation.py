@@ -0,0 +1,107 @@
+"""
+Simulación Monte Carlo de los partidos pendientes.
+
+Parte de un `ResultsModel` (fixture + marcadores ya jugados), sortea el marcador
+de todos los partidos sin resultado con un `ScoreModel` configurable y vuelve a
+ordenar la clasificación (PG, DG, JG, como calculate_standings_*) en cada
+simulación. Las simulaciones se generan por lotes vectorizados (matrices
+simulación × partido) y los lotes se reparten entre procesos.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+SCORE_KIND_SET = "set"      # El ganador hace `games` juegos; el perdedor, de 0 a games-1
+SCORE_KIND_TOTAL = "total"  # Se juegan `games` juegos en total (binomial); puede haber empate
+STRENGTH_EQUAL = "igualado" # Todos los partidos al 50 %
+STRENGTH_FORM = "forma"     # Probabilidad según el % de juegos ganados hasta ahora
+
+
+class ScoreModel:
+    """Modelo de marcador para los partidos simulados."""
+
+    def __init__(self, kind=SCORE_KIND_SET, games=6, strength=STRENGTH_EQUAL):
+        if kind not in (SCORE_KIND_SET, SCORE_KIND_TOTAL): raise ValueError(f"Modelo de marcador desconocido: {kind}")
+        if strength not in (STRENGTH_EQUAL, STRENGTH_FORM): raise ValueError(f"Modelo de fuerza desconocido: {strength}")
+        if games < 1: raise ValueError("El nº de juegos debe ser al menos 1.")
+        self.kind = kind; self.games = int(games); self.strength = strength
+
+    def win_probability(self, base_stats, sides):
+        """Probabilidad (por partido pendiente) de que gane cada juego/partido el lado 1."""
+        if self.strength == STRENGTH_EQUAL or len(sides) == 0: return np.full(len(sides), 0.5)
+        # Ratio de juegos ganados con suavizado de Laplace (sin datos = 0.5)
+        ratio = (base_stats['JG'] + 1) / (base_stats['JG'] + base_stats['JR'] + 2)
+        strength1 = ratio[sides[:, 0, :]].mean(axis=1); strength2 = ratio[sides[:, 1, :]].mean(axis=1)
+        return strength1 / (strength1 + strength2)
+
+    def sample(self, rng, p, batch):
+        """Marcadores (s1, s2) de forma (batch, nº partidos)."""
+        if self.kind == SCORE_KIND_TOTAL:
+            s1 = rng.binomial(self.games, p, size=(batch, len(p)))
+            return s1, self.games - s1
+        side1_wins = rng.random((batch, len(p))) < p
+        loser = rng.integers(0, self.games, size=(batch, len(p)))
+        return np.where(side1_wins, self.games, loser), np.where(side1_wins, loser, self.games)
+
+
+def _incidence(sides, num_entities):
+    """Matrices partido × entidad (float) de cada lado, para sumar contribuciones con un producto matricial."""
+    num_matches, _, width = sides.shape; rows = np.repeat(np.arange(num_matches), width)
+    a1 = np.zeros((num_matches, num_entities)); a2 = np.zeros((num_matches, num_entities))
+    np.add.at(a1, (rows, sides[:, 0, :].ravel()), 1); np.add.at(a2, (rows, sides[:, 1, :].ravel()), 1)
+    return a1, a2
+
+
+def _simulate_chunk(args):
+    """Ejecuta `n_sims` simulaciones en lotes y devuelve la matriz de recuentos entidad × posición."""
+    base, sides, p, score_model, n_sims, batch_size, seed = args
+    rng = np.random.default_rng(seed); num = len(base['PG'])
+    a1, a2 = _incidence(sides, num); counts = np.zeros((num, num), dtype=np.int64)
+    # Clave única de orden: PG domina a DG, que domina a JG (márgenes holgados para que no se solapen)
+    max_games = int(base['JG'].max() + base['JR'].max()) + score_model.games * (len(sides) + 1) + 1
+    done = 0
+    while done < n_sims:
+        batch = min(batch_size, n_sims - done)
+        s1, s2 = score_model.sample(rng, p, batch)
+        jg = base['JG'] + (s1 @ a1 + s2 @ a2).astype(np.int64)
+        jr = base['JR'] + (s2 @ a1 + s1 @ a2).astype(np.int64)
+        pg = base['PG'] + ((s1 > s2) @ a1 + (s2 > s1) @ a2).astype(np.int64)
+        key = (pg * (2 * max_games + 1) + (jg - jr + max_games)) * (max_games + 1) + jg
+        order = np.argsort(-key, axis=1, kind='stable')  # estable: en empate gana el que se dio de alta antes
+        positions = np.empty_like(order); np.put_along_axis(positions, order, np.arange(num)[None, :], axis=1)
+        counts += np.bincount((np.arange(num)[None, :] * num + positions).ravel(), minlength=num * num).reshape(num, num)
+        done += batch
+    return counts
+
+
+def simulate_positions(model, n_sims=100_000, score_model=None, workers=None, batch_size=4000, seed=None):
+    """
+    Probabilidad de que cada entidad de `model` termine en cada posición.
+    Devuelve un array (nº entidades × nº posiciones) con filas que suman 1.
+    `workers` = nº de procesos (None = nº de CPUs; 1 = en el propio proceso).
+    """
+    score_model = score_model or ScoreModel()
+    base = model.compute(); pending = model.scores[:, 0] < 0
+    sides = model.sides[pending]; p = score_model.win_probability(base, sides)
+    workers = workers or os.cpu_count() or 1
+    # Trocea en al menos un lote por proceso; con pocas simulaciones no compensa arrancar procesos
+    n_chunks = max(1, min(workers, n_sims // batch_size))
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    chunks = [(base, sides, p, score_model, n_sims // n_chunks + (1 if i < n_sims % n_chunks else 0), batch_size, seeds[i]) for i in range(n_chunks)]
+    if n_chunks == 1: counts = _simulate_chunk(chunks[0])
+    else:
+        context = multiprocessing.get_context("forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+        with ProcessPoolExecutor(max_workers=n_chunks, mp_context=context) as pool: counts = sum(pool.map(_simulate_chunk, chunks))
+    return counts / max(1, n_sims)
+
+
+def positions_dataframe(entities, probabilities, entity_label, order=None):
+    """DataFrame con el % de cada posición y la posición esperada (pandas se importa aquí)."""
+    import pandas as pd
+    order = np.arange(len(entities)) if order is None else np.asarray(order)
+    probs = probabilities[order]; num = probs.shape[1]
+    data = {entity_label: [entities[i] for i in order], "Pos. esperada": probs @ np.arange(1, num + 1)}
+    data.update({f"{k + 1}º": probs[:, k] * 100 for k in range(num)})
+    return pd.DataFrame(data)
@@ -0,0 +1,53 @@
+"""
+Cálculo completo de clasificaciones a partir de un fixture y sus marcadores.
+
+`scores` es cualquier mapeo con `.get()` que contenga las claves
+`score1_r{ronda}_m{partido}` / `score2_r{ronda}_m{partido}` (en la app,
+`st.session_state`; en la CLI o en pruebas, un `dict`).
+"""
+from .ledger import STAT_KEYS, match_sides
+
+
+def _empty_standings(entities):
+    return {e: {k: 0 for k in STAT_KEYS} for e in entities}
+
+
+def _accumulate(standings, fixture_data, scores, is_pairs):
+    """Suma todos los partidos con marcador completo a `standings` (se ignoran los de entidades desconocidas)."""
+    for round_data in fixture_data.get('rounds', []):
+        for match_idx, match in enumerate(round_data.get('matches', [])):
+            match_id = f"r{round_data.get('round_num', '?')}_m{match_idx}"
+            score1 = scores.get(f"score1_{match_id}"); score2 = scores.get(f"score2_{match_id}")
+            if score1 is None or score2 is None: continue
+            sides = match_sides(match, is_pairs)
+            if sides is None: continue
+            side1, side2 = sides
+            if not all(e in standings for e in side1 + side2): continue
+            s1, s2 = int(score1), int(score2)
+            if s1 > s2:   res1, res2 = 'PG', 'PP'
+            elif s2 > s1: res1, res2 = 'PP', 'PG'
+            else:         res1, res2 = 'PE', 'PE'
+            for e in side1: standings[e]['JG'] += s1; standings[e]['JR'] += s2; standings[e]['PJ'] += 1; standings[e][res1] += 1
+            for e in side2: standings[e]['JG'] += s2; standings[e]['JR'] += s1; standings[e]['PJ'] += 1; standings[e][res2] += 1
+    for stats in standings.values(): stats['DG'] = stats['JG'] - stats['JR']
+
+
+def _sort_entities(standings, entities):
+    return sorted(entities, key=lambda e: (standings[e]['PG'], standings[e]['DG'], standings[e]['JG']), reverse=True)
+
+
+def calculate_standings_americano(players, fixture_data, scores):
+    """Calcula la clasificación individual para torneo Americano."""
+    standings = _empty_standings(players)
+    if not fixture_data or 'rounds' not in fixture_data: return standings, []
+    _accumulate(standings, fixture_data, scores, is_pairs=False)
+    return standings, _sort_entities(standings, players)
+
+
+def calculate_standings_pairs(pairs, fixture_data, scores):
+    """Calcula la clasificación por parejas para torneo Round Robin."""
+    pair_names = [f"{p[0]}/{p[1]}" for p in pairs]
+    standings = _empty_standings(pair_names)
+    if not fixture_data or 'rounds' not in fixture_data: return standings, []
+    _accumulate(standings, fixture_data, scores, is_pairs=True)
+    return standings, _sort_entities(standings, pair_names)
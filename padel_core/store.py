@@ -0,0 +1,270 @@
+"""
+Persistencia de torneos en SQLite (modo WAL).
+
+Guarda torneos, jugadores, parejas, rondas, partidos y resultados en tablas con
+clave (torneo, ronda, partido), de modo que cargar un torneo completo son unas
+pocas consultas indexadas. En modo WAL las lecturas no esperan a las escrituras,
+y los marcadores se escriben en lotes desde un hilo propio (`queue_result`) para
+no bloquear el dibujado de la página. Si un lote no se puede escribir, el hilo
+sigue vivo: lo reintenta en el siguiente ciclo y deja el motivo en `last_error`.
+"""
+import json
+import logging
+import queue
+import re
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tournaments (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    tournament_type TEXT,
+    config TEXT NOT NULL,
+    fixture_meta TEXT NOT NULL DEFAULT '{}',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS players (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (tournament_id, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS pairs (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    player1 TEXT NOT NULL,
+    player2 TEXT NOT NULL,
+    PRIMARY KEY (tournament_id, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rounds (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments(id) ON DELETE CASCADE,
+    round_num INTEGER NOT NULL,
+    resting TEXT NOT NULL DEFAULT '[]',
+    PRIMARY KEY (tournament_id, round_num)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS matches (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments(id) ON DELETE CASCADE,
+    round_num INTEGER NOT NULL,
+    match_idx INTEGER NOT NULL,
+    court INTEGER,
+    pair1 TEXT NOT NULL,
+    pair2 TEXT NOT NULL,
+    PRIMARY KEY (tournament_id, round_num, match_idx)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS results (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments(id) ON DELETE CASCADE,
+    round_num INTEGER NOT NULL,
+    match_idx INTEGER NOT NULL,
+    score1 INTEGER NOT NULL,
+    score2 INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (tournament_id, round_num, match_idx)
+) WITHOUT ROWID;
+"""
+
+_MATCH_ID_RE = re.compile(r"^r(\d+)_m(\d+)$")
+_STOP = object()
+# Segundos entre reintentos de los marcadores que no se han podido escribir (p. ej. base bloqueada)
+RETRY_INTERVAL = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+class StoreError(RuntimeError):
+    """No se han podido guardar los marcadores encolados; el motivo está en `TournamentStore.last_error`."""
+
+
+def parse_match_id(match_id):
+    """'r3_m1' -> (3, 1)."""
+    m = _MATCH_ID_RE.match(match_id)
+    if not m: raise ValueError(f"Identificador de partido no válido: {match_id}")
+    return int(m.group(1)), int(m.group(2))
+
+
+def _queued_scores(match_id, s1, s2):
+    """Valida un marcador antes de encolarlo, para que un dato erróneo falle en quien llama y no en el hilo de escritura."""
+    parse_match_id(match_id)
+    return (None, None) if s1 is None or s2 is None else (int(s1), int(s2))
+
+
+class TournamentStore:
+    """Almacén de torneos. Cada hilo usa su propia conexión; las escrituras de marcadores van por lotes."""
+
+    def __init__(self, path, flush_interval=0.25, max_batch=500):
+        self.path = str(path)
+        self.flush_interval = flush_interval; self.max_batch = max_batch
+        self._local = threading.local()
+        self._queue = queue.Queue(); self._writer = None; self._writer_lock = threading.Lock()
+        # Marcadores que el hilo no ha podido escribir (se reintentan) y nº de descartados por no ser escribibles
+        self._failed = {}; self.dropped = 0; self.last_error = None
+        with self._connect() as conn: conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL"); conn.execute("PRAGMA synchronous=NORMAL"); conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    # --- Escritura ---
+    def save_tournament(self, config, tournament_type, players, pairs, fixture):
+        """Guarda un torneo recién generado (sin resultados) y devuelve su ID."""
+        now = time.time(); meta = {k: v for k, v in (fixture or {}).items() if k != "rounds"}
+        with self._connect() as conn:
+            tid = conn.execute("INSERT INTO tournaments (name, tournament_type, config, fixture_meta, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                               (config.get("name", ""), tournament_type, json.dumps(config), json.dumps(meta), now, now)).lastrowid
+            conn.executemany("INSERT INTO players VALUES (?, ?, ?)", [(tid, i, p) for i, p in enumerate(players)])
+            conn.executemany("INSERT INTO pairs VALUES (?, ?, ?, ?)", [(tid, i, p[0], p[1]) for i, p in enumerate(pairs or [])])
+            self._insert_rounds(conn, tid, (fixture or {}).get("rounds", []))
+        return tid
+
+    def _insert_rounds(self, conn, tid, rounds):
+        conn.executemany("INSERT INTO rounds VALUES (?, ?, ?)", [(tid, r["round_num"], json.dumps(r.get("resting", []))) for r in rounds])
+        conn.executemany("INSERT INTO matches VALUES (?, ?, ?, ?, ?, ?)",
+                         [(tid, r["round_num"], i, m.get("court"), json.dumps(list(m["pair1"])), json.dumps(list(m["pair2"])))
+                          for r in rounds for i, m in enumerate(r.get("matches", []))])
+
+    def save_replan(self, tournament_id, config, players, pairs, fixture, first_round):
+        """
+        Guarda una replanificación: sustituye las rondas desde `first_round` (y sus
+        resultados), la lista de jugadores/parejas y la configuración. Las rondas
+        anteriores y sus resultados no se tocan.
+        """
+        # Que ningún marcador encolado caiga sobre las rondas que se borran
+        if not self.flush(): raise StoreError(f"Hay marcadores sin guardar: {self.last_error or 'tiempo de espera agotado'}")
+        now = time.time(); meta = {k: v for k, v in fixture.items() if k != "rounds"}
+        with self._connect() as conn:
+            for table in ("results", "matches", "rounds"): conn.execute(f"DELETE FROM {table} WHERE tournament_id = ? AND round_num >= ?", (tournament_id, first_round))
+            for table in ("players", "pairs"): conn.execute(f"DELETE FROM {table} WHERE tournament_id = ?", (tournament_id,))
+            conn.executemany("INSERT INTO players VALUES (?, ?, ?)", [(tournament_id, i, p) for i, p in enumerate(players)])
+            conn.executemany("INSERT INTO pairs VALUES (?, ?, ?, ?)", [(tournament_id, i, p[0], p[1]) for i, p in enumerate(pairs or [])])
+            self._insert_rounds(conn, tournament_id, [r for r in fixture.get("rounds", []) if r["round_num"] >= first_round])
+            conn.execute("UPDATE tournaments SET config = ?, fixture_meta = ?, updated_at = ? WHERE id = ?", (json.dumps(config), json.dumps(meta), now, tournament_id))
+
+    def save_fixture_meta(self, tournament_id, fixture):
+        """Actualiza los datos del fixture que no son rondas (p. ej. el cuadro de eliminatoria)."""
+        meta = {k: v for k, v in fixture.items() if k != "rounds"}
+        with self._connect() as conn: conn.execute("UPDATE tournaments SET fixture_meta = ?, updated_at = ? WHERE id = ?", (json.dumps(meta), time.time(), tournament_id))
+
+    def save_results(self, tournament_id, results):
+        """Escribe en una sola transacción un lote {match_id: (s1, s2)}; (None, None) borra el resultado."""
+        self._write_batch({(tournament_id, match_id): scores for match_id, scores in results.items()})
+
+    def _write_batch(self, batch):
+        now = time.time(); upserts = []; deletes = []; touched = set()
+        for (tid, match_id), (s1, s2) in batch.items():
+            round_num, match_idx = parse_match_id(match_id); touched.add(tid)
+            if s1 is None or s2 is None: deletes.append((tid, round_num, match_idx))
+            else: upserts.append((tid, round_num, match_idx, int(s1), int(s2), now))
+        with self._connect() as conn:
+            conn.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (tournament_id, round_num, match_idx) "
+                             "DO UPDATE SET score1 = excluded.score1, score2 = excluded.score2, updated_at = excluded.updated_at", upserts)
+            conn.executemany("DELETE FROM results WHERE tournament_id = ? AND round_num = ? AND match_idx = ?", deletes)
+            conn.executemany("UPDATE tournaments SET updated_at = ? WHERE id = ?", [(now, tid) for tid in touched])
+
+    def queue_result(self, tournament_id, match_id, s1, s2):
+        """Encola un marcador para escribirlo en segundo plano (no bloquea a quien llama). Lanza ValueError si no es válido."""
+        scores = _queued_scores(match_id, s1, s2); self._ensure_writer(); self._queue.put(((tournament_id, match_id), scores))
+
+    def queue_results(self, tournament_id, results):
+        """Encola un lote {match_id: (s1, s2)} respetando el orden con los marcadores ya encolados."""
+        items = [((tournament_id, match_id), _queued_scores(match_id, *scores)) for match_id, scores in results.items()]
+        self._ensure_writer()
+        for item in items: self._queue.put(item)
+
+    def flush(self, timeout=5.0):
+        """
+        Espera a que se escriban los marcadores encolados hasta ahora. Devuelve False si
+        no da tiempo o si alguno no se ha podido guardar (motivo en `last_error`).
+        """
+        if self._writer is None: return True
+        self._ensure_writer(); dropped = self.dropped
+        done = threading.Event(); self._queue.put(done)
+        return done.wait(timeout) and not self._failed and self.dropped == dropped
+
+    def close(self):
+        if self._writer is not None and self._writer.is_alive(): self._queue.put(_STOP); self._writer.join(timeout=5)
+        self._writer = None
+        conn = getattr(self._local, "conn", None)
+        if conn is not None: conn.close(); self._local.conn = None
+
+    def _ensure_writer(self):
+        """Arranca el hilo de escritura, o lo vuelve a arrancar si ha muerto."""
+        if self._writer is not None and self._writer.is_alive(): return
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                if self._writer is not None: logger.error("El hilo de escritura de marcadores había terminado; se vuelve a arrancar")
+                self._writer = threading.Thread(target=self._writer_loop, name="padel-store-writer", daemon=True); self._writer.start()
+
+    def _writer_loop(self):
+        while True:
+            # Con marcadores pendientes de reintento no se espera indefinidamente a que llegue otro
+            try: item = self._queue.get(timeout=RETRY_INTERVAL if self._failed else None)
+            except queue.Empty: item = None
+            batch = dict(self._failed); waiters = []; stop = False
+            deadline = time.monotonic() + self.flush_interval
+            # Acumula lo que llegue durante `flush_interval` (el último marcador de cada partido gana)
+            while item is not None:
+                if item is _STOP: stop = True; break
+                if isinstance(item, threading.Event): waiters.append(item); break
+                batch[item[0]] = item[1]
+                if len(batch) >= self.max_batch: break
+                try: item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty: break
+            try:
+                if batch: self._failed = self._write_pending(batch)
+            except Exception: logger.exception("Error inesperado en el hilo de escritura de marcadores")
+            finally:
+                for w in waiters: w.set()
+            if stop: return
+
+    def _write_pending(self, batch):
+        """Escribe un lote del hilo de escritura sin dejar que un error lo tumbe. Devuelve los marcadores que quedan por reintentar."""
+        try: self._write_batch(batch)
+        except sqlite3.OperationalError as exc: # Base bloqueada, disco lleno...: el lote entero se reintenta
+            logger.warning("No se han podido guardar %d marcadores; se reintentará: %s", len(batch), exc)
+            self.last_error = f"{len(batch)} marcadores sin guardar ({exc}); se reintentará."; return batch
+        except sqlite3.Error: # Algún marcador no se puede escribir nunca: se escriben uno a uno y se descartan los que fallan
+            failed = {}
+            for key, scores in batch.items():
+                try: self._write_batch({key: scores})
+                except sqlite3.OperationalError as exc: failed[key] = scores; self.last_error = f"Marcadores sin guardar ({exc}); se reintentará."
+                except sqlite3.Error as exc:
+                    logger.error("Se descarta el marcador %s del torneo #%s: %s", key[1], key[0], exc)
+                    self.dropped += 1; self.last_error = f"Se ha descartado el marcador {key[1]} del torneo #{key[0]} ({exc})."
+            return failed
+        self.last_error = None; return {}
+
+    # --- Lectura ---
+    def load_tournament(self, tournament_id):
+        """
+        Carga un torneo para reanudarlo: dict con id, config, tournament_type, players,
+        pairs, fixture y scores (claves `score1_*`/`score2_*`). None si no existe.
+        """
+        conn = self._connect()
+        row = conn.execute("SELECT tournament_type, config, fixture_meta FROM tournaments WHERE id = ?", (tournament_id,)).fetchone()
+        if row is None: return None
+        players = [r[0] for r in conn.execute("SELECT name FROM players WHERE tournament_id = ? ORDER BY position", (tournament_id,))]
+        pairs = [(a, b) for a, b in conn.execute("SELECT player1, player2 FROM pairs WHERE tournament_id = ? ORDER BY position", (tournament_id,))]
+        fixture = json.loads(row[2]); rounds = {}
+        for round_num, resting in conn.execute("SELECT round_num, resting FROM rounds WHERE tournament_id = ? ORDER BY round_num", (tournament_id,)):
+            rounds[round_num] = {"round_num": round_num, "matches": [], "resting": json.loads(resting)}
+        for round_num, _, court, pair1, pair2 in conn.execute("SELECT round_num, match_idx, court, pair1, pair2 FROM matches WHERE tournament_id = ? ORDER BY round_num, match_idx", (tournament_id,)):
+            rounds[round_num]["matches"].append({"court": court, "pair1": tuple(json.loads(pair1)), "pair2": tuple(json.loads(pair2)), "score1": None, "score2": None})
+        fixture["rounds"] = list(rounds.values())
+        scores = {}
+        for match_id, (s1, s2) in self.load_results(tournament_id).items(): scores[f"score1_{match_id}"] = s1; scores[f"score2_{match_id}"] = s2
+        return {"id": tournament_id, "config": json.loads(row[1]), "tournament_type": row[0], "players": players, "pairs": pairs, "fixture": fixture, "scores": scores}
+
+    def load_results(self, tournament_id):
+        """Resultados guardados de un torneo: {match_id: (s1, s2)}."""
+        rows = self._connect().execute("SELECT round_num, match_idx, score1, score2 FROM results WHERE tournament_id = ?", (tournament_id,))
+        return {f"r{round_num}_m{match_idx}": (s1, s2) for round_num, match_idx, s1, s2 in rows}
+
+    def list_tournaments(self, limit=20):
+        """Últimos torneos modificados: [(id, nombre, updated_at)]."""
+        return self._connect().execute("SELECT id, name, updated_at FROM tournaments ORDER BY updated_at DESC LIMIT ?", (limit,)).fetchall()